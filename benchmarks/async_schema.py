@@ -0,0 +1,55 @@
+"""Measure ``AsyncSchema`` on I/O-bound and purely synchronous schemas.
+
+Run from the repository root with ``python -m benchmarks.async_schema``.
+"""
+import asyncio
+import time
+import timeit
+
+from voluptuous import AsyncSchema, Invalid, Required, Schema
+
+KNOWN = {'user%d' % i for i in range(100)}
+
+
+async def known_user(value):
+    await asyncio.sleep(0.01)
+    if value not in KNOWN:
+        raise Invalid('unknown user')
+    return value
+
+
+def sequential(value):
+    time.sleep(0.01)
+    if value not in KNOWN:
+        raise Invalid('unknown user')
+    return value
+
+
+RECORD = {Required('id'): int, Required('name'): str, 'tags': [str]}
+DATA = {'owner': 'user1', 'reviewers': ['user%d' % i for i in range(20)], 'record': {'id': 1, 'name': 'x', 'tags': ['a']}}
+
+
+def main(number=2000):
+    blocking = Schema({'owner': sequential, 'reviewers': [sequential], 'record': RECORD})
+    for name, schema in (('AsyncSchema', AsyncSchema({'owner': known_user, 'reviewers': [known_user], 'record': RECORD})), ('AsyncSchema(4)', AsyncSchema({'owner': known_user, 'reviewers': [known_user], 'record': RECORD}, concurrency=4))):
+        start = time.perf_counter()
+        asyncio.run(schema(DATA))
+        print('%-16s 21 lookups %8.1f ms' % (name, (time.perf_counter() - start) * 1e3))
+    start = time.perf_counter()
+    blocking(DATA)
+    print('%-16s 21 lookups %8.1f ms' % ('blocking Schema', (time.perf_counter() - start) * 1e3))
+    sync = Schema(RECORD)
+    wrapped = AsyncSchema(RECORD)
+    record = DATA['record']
+
+    async def run_async():
+        for _ in range(number):
+            await wrapped(record)
+
+    for name, func in (('Schema', lambda: [sync(record) for _ in range(number)]), ('AsyncSchema', lambda: asyncio.run(run_async()))):
+        best = min(timeit.repeat(func, number=1, repeat=5)) / number
+        print('%-16s sync-only %8.2f us/call' % (name, best * 1e6))
+
+
+if __name__ == '__main__':
+    main()
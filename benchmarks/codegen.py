@@ -0,0 +1,47 @@
+"""Compare the closure and code-generating backends on nested dict schemas.
+
+Run from the repository root with ``python -m benchmarks.codegen``.
+"""
+import timeit
+
+from voluptuous import All, Optional, Range, Required, Schema
+
+ADDRESS = {Required('street'): str, Required('city'): str, 'zip': str, 'country': str}
+SCHEMA = {
+    Required('id'): int,
+    Required('name'): str,
+    'email': str,
+    'active': bool,
+    'score': float,
+    'age': All(int, Range(min=0)),
+    'kind': 'user',
+    'address': ADDRESS,
+    'billing': ADDRESS,
+    Optional('meta', default=dict): {'source': str, 'version': int, 'tags': [str]},
+}
+PAYLOAD = {
+    'id': 1,
+    'name': 'Alice',
+    'email': 'alice@example.com',
+    'active': True,
+    'score': 0.5,
+    'age': 42,
+    'kind': 'user',
+    'address': {'street': '1 Main St', 'city': 'Springfield', 'zip': '12345', 'country': 'US'},
+    'billing': {'street': '2 Side St', 'city': 'Shelbyville', 'zip': '54321', 'country': 'US'},
+    'meta': {'source': 'api', 'version': 3, 'tags': ['a', 'b']},
+}
+
+
+def main(number=20000):
+    results = {}
+    for backend in ('closure', 'codegen'):
+        validate = Schema(SCHEMA, backend=backend)
+        assert validate(PAYLOAD) == PAYLOAD
+        results[backend] = min(timeit.repeat(lambda: validate(PAYLOAD), number=number, repeat=5))
+        print('%-8s %8.2f us/call' % (backend, results[backend] / number * 1e6))
+    print('speedup  %8.2fx' % (results['closure'] / results['codegen']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Measure the cost of shipping 100k validation errors between processes.
+
+Run from the repository root with ``python -m benchmarks.errors``.
+"""
+import json
+import pickle
+import timeit
+
+from voluptuous import MultipleInvalid, Schema
+
+SCHEMA = Schema({str: {'id': int}})
+DATA = {'record%d' % i: {'id': str(i)} for i in range(100000)}
+
+
+def collect():
+    try:
+        SCHEMA(DATA)
+    except MultipleInvalid as e:
+        return e
+    raise AssertionError('expected errors')
+
+
+def main(number=3):
+    error = collect()
+    payload = pickle.dumps(error, pickle.HIGHEST_PROTOCOL)
+    assert [str(e) for e in pickle.loads(payload).errors] == [str(e) for e in error.errors]
+    dumps = min(timeit.repeat(lambda: pickle.dumps(error, pickle.HIGHEST_PROTOCOL), number=number, repeat=3)) / number
+    loads = min(timeit.repeat(lambda: pickle.loads(payload), number=number, repeat=3)) / number
+    print('pickle  %6d errors %8.1f KiB dumps %7.1f ms loads %7.1f ms' % (len(error.errors), len(payload) / 1024, dumps * 1e3, loads * 1e3))
+    if hasattr(error, 'to_dict'):
+        text = json.dumps(error.to_dict())
+        dumps = min(timeit.repeat(lambda: json.dumps(error.to_dict()), number=number, repeat=3)) / number
+        loads = min(timeit.repeat(lambda: MultipleInvalid.from_dict(json.loads(text)), number=number, repeat=3)) / number
+        print('json    %6d errors %8.1f KiB dumps %7.1f ms loads %7.1f ms' % (len(error.errors), len(text) / 1024, dumps * 1e3, loads * 1e3))
+
+
+if __name__ == '__main__':
+    main()
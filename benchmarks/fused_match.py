@@ -0,0 +1,37 @@
+"""Time ``Any`` over many ``Match`` alternatives and dicts keyed by ``Match``.
+
+Run from the repository root with ``python -m benchmarks.fused_match``.
+Each case is compared with the same schema wrapped in ``All``, which is
+not fused, so every pattern is tried in turn.
+"""
+import timeit
+
+from voluptuous import All, Any, Invalid, Match, Schema
+
+SIZE = 20000
+PREFIXES = ['svc%02d' % i for i in range(32)]
+ALTERNATIVES = [Match(r'^%s-[a-z]+-\d{3}$' % prefix) for prefix in PREFIXES]
+VALUES = ['%s-node-%03d' % (PREFIXES[i % len(PREFIXES)], i % 1000) for i in range(SIZE)]
+HEADERS = {Match('^x-%s-' % prefix): str for prefix in PREFIXES}
+HEADER_DATA = {'x-%s-id' % prefix: 'v' for prefix in PREFIXES}
+
+
+def call(schema, data):
+    try:
+        schema(data)
+    except Invalid:
+        pass
+
+
+def main(number=3):
+    cases = (
+        ('Any(32 x Match)', Schema([Any(*ALTERNATIVES)]), Schema([Any(*[All(m) for m in ALTERNATIVES])]), VALUES),
+        ('32 Match keys', Schema(HEADERS), Schema({All(k): v for k, v in HEADERS.items()}), HEADER_DATA),
+    )
+    for label, fused, separate, data in cases:
+        timings = [min(timeit.repeat(lambda: call(schema, data), number=number, repeat=3)) / number for schema in (separate, fused)]
+        print('%-16s separate %8.2f ms fused %8.2f ms %6.2fx' % (label, timings[0] * 1e3, timings[1] * 1e3, timings[0] / timings[1]))
+
+
+if __name__ == '__main__':
+    main()
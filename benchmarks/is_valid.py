@@ -0,0 +1,50 @@
+"""Compare full validation with ``Schema.is_valid`` on a large document.
+
+Run from the repository root with ``python -m benchmarks.is_valid``.
+"""
+import timeit
+import tracemalloc
+
+from voluptuous import Any, Required, Schema
+
+ITEM = {Required('id'): int, Required('name'): str, 'tags': [str], 'owner': {'id': int, 'email': str}, 'state': Any('open', 'closed')}
+SCHEMA = Schema({Required('items'): [ITEM], 'total': int})
+VALID = {
+    'items': [{'id': i, 'name': 'item%d' % i, 'tags': ['a', 'b', 'c'], 'owner': {'id': i, 'email': 'x@example.com'}, 'state': 'open'} for i in range(2000)],
+    'total': 2000,
+}
+INVALID = {'items': VALID['items'][:-1] + [dict(VALID['items'][-1], id='last')], 'total': 2000}
+# Mappings collect an error per key, so with every record broken __call__
+# validates them all while is_valid stops at the first.
+BY_ID = Schema({str: ITEM})
+BROKEN = {'item%d' % i: dict(item, id=str(i)) for i, item in enumerate(VALID['items'])}
+
+
+def call(data, schema=SCHEMA):
+    try:
+        schema(data)
+    except Exception:
+        return False
+    return True
+
+
+def peak(func, data):
+    tracemalloc.start()
+    func(data)
+    result = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def main(number=20):
+    assert call(VALID) and SCHEMA.is_valid(VALID)
+    assert not call(INVALID) and not SCHEMA.is_valid(INVALID)
+    assert not call(BROKEN, BY_ID) and not BY_ID.is_valid(BROKEN)
+    for label, schema, data in (('valid', SCHEMA, VALID), ('invalid', SCHEMA, INVALID), ('broken', BY_ID, BROKEN)):
+        for name, func in (('__call__', lambda data: call(data, schema)), ('is_valid', schema.is_valid)):
+            best = min(timeit.repeat(lambda: func(data), number=number, repeat=5)) / number
+            print('%-8s %-9s %8.2f ms %10.1f KiB peak' % (label, name, best * 1e3, peak(func, data) / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Show that ``Schema.iter_validate`` keeps memory flat as streams grow.
+
+Run from the repository root with ``python -m benchmarks.iter_validate``.
+"""
+import time
+import tracemalloc
+
+from voluptuous import Required, Schema
+
+SCHEMA = Schema({Required('id'): int, Required('name'): str})
+
+
+def records(count):
+    for i in range(count):
+        yield {'id': i, 'name': 'user%d' % i} if i % 100 else {'id': str(i)}
+
+
+def consume(count):
+    invalid = 0
+    for _, outcome in SCHEMA.iter_validate(records(count)):
+        invalid += isinstance(outcome, Exception)
+    return invalid
+
+
+def main():
+    for count in (10000, 100000, 300000):
+        tracemalloc.start()
+        start = time.perf_counter()
+        invalid = consume(count)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('%8d records %6d invalid %8.2f s %8.1f KiB peak' % (count, invalid, elapsed, peak / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Measure start-up time of a module defining 500 schemas, eager vs lazy.
+
+Run from the repository root with ``python -m benchmarks.lazy``.
+"""
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+from voluptuous import Schema
+
+SCHEMA_TEMPLATE = '''
+SCHEMA_{i} = Schema({{
+    Required('id'): int,
+    Required('name'): All(str, Length(min=1, max=64)),
+    'email': Email(),
+    'tags': [str],
+    'kind': Any('a', 'b', 'c'),
+    'score': Range(min=0, max={i}),
+    Optional('address', default=dict): {{'street': str, 'city': str, 'zip': Match(r'^[0-9]{{5}}$')}},
+}})
+'''
+
+
+def write_module(directory, count=500):
+    path = os.path.join(directory, 'many_schemas.py')
+    with open(path, 'w') as f:
+        f.write('from voluptuous import *\n')
+        for i in range(count):
+            f.write(SCHEMA_TEMPLATE.format(i=i))
+    return 'many_schemas'
+
+
+def import_and_validate_one(name):
+    sys.modules.pop(name, None)
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    module.SCHEMA_7({'id': 1, 'name': 'x', 'tags': ['a'], 'kind': 'a', 'score': 3})
+    return time.perf_counter() - start
+
+
+def main(repeat=5):
+    with tempfile.TemporaryDirectory() as directory:
+        name = write_module(directory)
+        sys.path.insert(0, directory)
+        try:
+            for lazy in (False, True):
+                Schema.default_lazy = lazy
+                best = min(import_and_validate_one(name) for _ in range(repeat))
+                print('%-6s %8.2f ms' % ('lazy' if lazy else 'eager', best * 1e3))
+        finally:
+            Schema.default_lazy = False
+            sys.path.remove(directory)
+
+
+if __name__ == '__main__':
+    main()
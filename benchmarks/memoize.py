@@ -0,0 +1,30 @@
+"""Time expensive scalar validators with and without ``Memoize``.
+
+Run from the repository root with ``python -m benchmarks.memoize``.
+"""
+import timeit
+
+from voluptuous import Coerce, Datetime, Email, FqdnUrl, Match, Memoize, Schema, Url
+
+SIZE = 100000
+DISTINCT = 500
+CASES = (
+    ('Email', Email(), ['user%d@host%d.example.com' % (i % DISTINCT, i % DISTINCT % 7) for i in range(SIZE)]),
+    ('Url', Url(), ['https://host%d.example.com/path?q=%d' % (i % DISTINCT, i % DISTINCT % 3) for i in range(SIZE)]),
+    ('FqdnUrl', FqdnUrl(), ['https://host%d.example.com/' % (i % DISTINCT) for i in range(SIZE)]),
+    ('Match', Match(r'^[a-z]+-\d{4}-[a-f0-9]{8}$'), ['item-%04d-deadbeef' % (i % DISTINCT) for i in range(SIZE)]),
+    ('Datetime', Datetime(), ['2024-01-%02dT10:%02d:00.000Z' % (i % 28 + 1, i % 18) for i in range(SIZE)]),
+    ('Coerce(float)', Coerce(float), ['%d.25' % (i % DISTINCT) for i in range(SIZE)]),
+)
+
+
+def main(number=3):
+    for label, validator, data in CASES:
+        timings = []
+        for schema in (Schema([validator]), Schema([Memoize(validator, maxsize=1000)])):
+            timings.append(min(timeit.repeat(lambda: schema(data), number=number, repeat=3)) / number)
+        print('%-14s %8.1f ns/item plain %8.1f ns/item memoized %6.2fx' % (label, timings[0] * 1e9 / SIZE, timings[1] * 1e9 / SIZE, timings[0] / timings[1]))
+
+
+if __name__ == '__main__':
+    main()
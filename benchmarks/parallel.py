@@ -0,0 +1,38 @@
+"""Compare ``Schema.iter_validate`` with ``Schema.validate_parallel``.
+
+Run from the repository root with ``python -m benchmarks.parallel``.
+"""
+import os
+import time
+
+from voluptuous import All, Any, Length, Optional, Required, Schema
+
+SCHEMA = Schema(
+    {
+        Required('id'): int,
+        Required('name'): All(str, Length(min=1, max=64)),
+        Optional('tags', default=[]): [str],
+        'state': Any('open', 'closed', 'pending'),
+        'owner': {Required('id'): int, 'email': str},
+    }
+)
+RECORDS = [{'id': i, 'name': 'user%d' % i, 'tags': ['a', 'b'], 'state': 'open', 'owner': {'id': i, 'email': 'x@example.com'}} for i in range(200000)]
+
+
+def timed(outcomes):
+    start = time.perf_counter()
+    count = sum(1 for _ in outcomes)
+    return count, time.perf_counter() - start
+
+
+def main():
+    count, serial = timed(SCHEMA.iter_validate(RECORDS))
+    print('%-22s %8.2f s' % ('iter_validate', serial))
+    for workers in sorted({2, os.cpu_count() or 1}):
+        assert timed(SCHEMA.validate_parallel(RECORDS, workers=workers, chunksize=2000))[0] == count
+        elapsed = timed(SCHEMA.validate_parallel(RECORDS, workers=workers, chunksize=2000))[1]
+        print('%-22s %8.2f s %6.2fx' % ('validate_parallel(%d)' % workers, elapsed, serial / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Measure memory traced while validating nested documents.
+
+Error paths are only copied out of the shared path stack when an error is
+raised, so validating a valid node does not allocate a path list and the
+memory held at the deepest point grows linearly with depth.
+
+Run from the repository root with ``python -m benchmarks.paths``.
+"""
+import sys
+import timeit
+import tracemalloc
+
+from voluptuous import Optional, Schema, Self
+
+TREE = Schema({'name': str, Optional('children'): [Self]})
+
+
+def chain(depth):
+    node = {'name': 'leaf'}
+    for i in range(depth):
+        node = {'name': 'node%d' % i, 'children': [node]}
+    return node
+
+
+def wide(width):
+    return {'name': 'root', 'children': [{'name': 'child%d' % i, 'children': [{'name': 'leaf'}]} for i in range(width)]}
+
+
+def traced(data):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    TREE(data)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - before
+
+
+def main(number=20):
+    sys.setrecursionlimit(10000)
+    for label, data, nodes in (('deep', chain(300), 301), ('wide', wide(5000), 10001)):
+        assert TREE(data) is data
+        best = min(timeit.repeat(lambda: TREE(data), number=number, repeat=5)) / number
+        peak = traced(data)
+        print('%-5s %6d nodes %8.2f ms %10.1f KiB peak %8.1f B/node' % (label, nodes, best * 1e3, peak / 1024, peak / nodes))
+
+
+if __name__ == '__main__':
+    main()
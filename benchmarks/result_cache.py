@@ -0,0 +1,37 @@
+"""Time a schema with and without a result cache on repeated payloads.
+
+Run from the repository root with ``python -m benchmarks.result_cache``.
+"""
+import timeit
+
+from voluptuous import LRU, All, Coerce, Email, Length, Optional, Required, Schema, Url
+
+SCHEMA = {
+    Required('id'): Coerce(int),
+    Required('email'): Email(),
+    Optional('homepage'): Url(),
+    Optional('tags', default=[]): [All(str, Length(min=1))],
+    Optional('status'): {'state': str, 'uptime': Coerce(float)},
+}
+PAYLOADS = [
+    {
+        'id': str(i % 50),
+        'email': 'user%d@example.com' % (i % 50),
+        'homepage': 'https://example.com/%d' % (i % 50),
+        'tags': ['a', 'b'],
+        'status': {'state': 'ok', 'uptime': '12.5'},
+    }
+    for i in range(10000)
+]
+
+
+def main(number=3):
+    cache = LRU(1000)
+    for label, schema in (('no cache', Schema(SCHEMA)), ('LRU(1000)', Schema(SCHEMA, cache=cache))):
+        best = min(timeit.repeat(lambda: [schema(p) for p in PAYLOADS], number=number, repeat=3)) / number
+        print('%-10s %8.2f ms %8.2f us/payload' % (label, best * 1e3, best * 1e6 / len(PAYLOADS)))
+    print('hit rate %.3f' % cache.hit_rate)
+
+
+if __name__ == '__main__':
+    main()
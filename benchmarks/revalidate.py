@@ -0,0 +1,42 @@
+"""Compare full validation with ``Schema.revalidate`` after a small patch.
+
+Run from the repository root with ``python -m benchmarks.revalidate``.
+"""
+import json
+import timeit
+
+from voluptuous import All, Any, Length, Optional, Range, Required, Schema
+
+SERVICE = {
+    Required('name'): All(str, Length(min=1)),
+    Required('replicas'): All(int, Range(min=0)),
+    Optional('env', default={}): {str: str},
+    'ports': [{Required('port'): int, 'protocol': Any('tcp', 'udp')}],
+}
+SCHEMA = Schema({Required('version'): int, Required('services'): {str: SERVICE}})
+DOCUMENT = SCHEMA(
+    {
+        'version': 1,
+        'services': {
+            'service%d' % i: {'name': 'service%d' % i, 'replicas': 2, 'env': {'KEY%d' % j: 'value%d' % j for j in range(20)}, 'ports': [{'port': 8000 + j, 'protocol': 'tcp'} for j in range(10)]}
+            for i in range(2000)
+        },
+    }
+)
+PATHS = [['services', 'service1500', 'replicas'], ['services', 'service7', 'ports', 3, 'port'], ['services', 'service99', 'env', 'KEY0']]
+
+
+def main(number=5):
+    print('document %.1f MiB, %d changed paths' % (len(json.dumps(DOCUMENT)) / 2**20, len(PATHS)))
+    DOCUMENT['services']['service1500']['replicas'] = 3
+    DOCUMENT['services']['service7']['ports'][3]['port'] = 9000
+    DOCUMENT['services']['service99']['env']['KEY0'] = 'changed'
+    assert SCHEMA.revalidate(DOCUMENT, PATHS) == SCHEMA(DOCUMENT)
+    full = min(timeit.repeat(lambda: SCHEMA(DOCUMENT), number=number, repeat=3)) / number
+    patch = min(timeit.repeat(lambda: SCHEMA.revalidate(DOCUMENT, PATHS), number=number, repeat=3)) / number
+    print('full       %10.3f ms' % (full * 1e3))
+    print('revalidate %10.3f ms %8.0fx' % (patch * 1e3, full / patch))
+
+
+if __name__ == '__main__':
+    main()
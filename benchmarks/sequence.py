@@ -0,0 +1,33 @@
+"""Time homogeneous sequence schemas on large numeric and string lists.
+
+Run from the repository root with ``python -m benchmarks.sequence``.
+"""
+import timeit
+
+from voluptuous import Invalid, Schema
+
+SIZE = 1000000
+CASES = (
+    ('[int] ints', Schema([int]), list(range(SIZE))),
+    ('[float] floats', Schema([float]), [i / 2 for i in range(SIZE)]),
+    ('[int, float] mixed', Schema([int, float]), [i if i % 2 else i / 2 for i in range(SIZE)]),
+    ('[str] strings', Schema([str]), ['item%d' % i for i in range(SIZE)]),
+    ('[str] last bad', Schema([str]), ['item%d' % i for i in range(SIZE - 1)] + [0]),
+)
+
+
+def call(schema, data):
+    try:
+        schema(data)
+    except Invalid:
+        pass
+
+
+def main(number=3):
+    for label, schema, data in CASES:
+        best = min(timeit.repeat(lambda: call(schema, data), number=number, repeat=3)) / number
+        print('%-20s %8.2f ms %8.1f ns/item' % (label, best * 1e3, best * 1e9 / len(data)))
+
+
+if __name__ == '__main__':
+    main()
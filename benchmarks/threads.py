@@ -0,0 +1,59 @@
+"""Measure how validation throughput scales with threads sharing one schema.
+
+On free-threaded CPython (3.13t and later) throughput should grow with the
+thread count up to the number of cores. With the GIL it stays flat.
+
+Run from the repository root with ``python -m benchmarks.threads``.
+"""
+import os
+import sys
+import threading
+import time
+
+from voluptuous import All, Any, Exclusive, Inclusive, Length, Optional, Required, Schema
+
+RECORD = Schema({Required('id'): int, Required('name'): All(str, Length(max=64)), Optional('tags', default=[]): [str], 'owner': {'id': int, 'email': str}})
+GROUPS = Schema({Exclusive('ip', 'address'): str, Exclusive('host', 'address'): str, Inclusive('user', 'auth'): str, Inclusive('password', 'auth'): str})
+ALTERNATIVES = Schema(Any(None, 'auto', int, float, [str], {'kind': 'ref', 'id': int}))
+ADAPTIVE = Schema(Any(*[{'kind': 'k%d' % i, 'value': int} for i in range(20)], adaptive=True))
+SCENARIOS = (
+    ('record', RECORD, {'id': 1, 'name': 'n', 'tags': ['a', 'b'], 'owner': {'id': 2, 'email': 'x@example.com'}}),
+    ('groups', GROUPS, {'host': 'example.com', 'user': 'u', 'password': 'p'}),
+    ('any', ALTERNATIVES, {'kind': 'ref', 'id': 3}),
+    ('adaptive any', ADAPTIVE, {'kind': 'k19', 'value': 1}),
+    ('is_valid', RECORD.is_valid, {'id': 1, 'name': 'n', 'owner': {'id': 2}}),
+)
+
+
+def throughput(validate, data, threads, calls):
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(calls):
+            validate(data)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.join()
+    return threads * calls / (time.perf_counter() - start)
+
+
+def main(calls=20000):
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    counts = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    print('python %s, GIL %s, %d CPUs' % (sys.version.split()[0], 'enabled' if gil else 'disabled', os.cpu_count() or 1))
+    print('%-14s' % 'threads' + ''.join('%14d' % count for count in counts))
+    for name, validate, data in SCENARIOS:
+        for _ in range(2000):
+            validate(data)
+        rates = [throughput(validate, data, count, calls) for count in counts]
+        print('%-14s' % name + ''.join('%8.0fk %4.1fx' % (rate / 1e3, rate / rates[0]) for rate in rates))
+
+
+if __name__ == '__main__':
+    main()
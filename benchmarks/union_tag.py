@@ -0,0 +1,31 @@
+"""Compare tagged and discriminant-filtered ``Union`` over 200 event types.
+
+Run from the repository root with ``python -m benchmarks.union_tag``.
+"""
+import timeit
+
+from voluptuous import Required, Schema, Union
+
+EVENTS = [{Required('type'): 'event%d' % i, Required('id'): int, 'payload': {'value': int, 'note': str}} for i in range(200)]
+DATA = {'type': 'event150', 'id': 1, 'payload': {'value': 2, 'note': 'x'}}
+
+
+def discriminant(value, validators):
+    return [v for v in validators if v[Required('type')] == value.get('type')]
+
+
+def main(number=50):
+    schemas = {
+        'discriminant': Schema(Union(*EVENTS, discriminant=discriminant)),
+        'tag': Schema(Union(*EVENTS, tag='type')),
+    }
+    results = {}
+    for name, schema in schemas.items():
+        assert schema(DATA) == DATA
+        results[name] = min(timeit.repeat(lambda: schema(DATA), number=number, repeat=5)) / number
+        print('%-12s %8.2f us/call' % (name, results[name] * 1e6))
+    print('speedup      %8.2fx' % (results['discriminant'] / results['tag']))
+
+
+if __name__ == '__main__':
+    main()
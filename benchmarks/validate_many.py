@@ -0,0 +1,36 @@
+"""Compare ``Schema.validate_many`` with a loop over ``Schema.__call__``.
+
+Run from the repository root with ``python -m benchmarks.validate_many``.
+"""
+import timeit
+
+from voluptuous import Invalid, Required, Schema
+
+SCHEMA = Schema({Required('id'): int, Required('name'): str, 'score': float})
+RECORDS = [{'id': i, 'name': 'user%d' % i, 'score': i / 3} if i % 10 else {'id': str(i), 'name': 'user%d' % i} for i in range(10000)]
+
+
+def loop(records):
+    outputs = {}
+    errors = {}
+    for index, record in enumerate(records):
+        try:
+            outputs[index] = SCHEMA(record)
+        except Invalid as e:
+            errors[index] = e
+    return outputs, errors
+
+
+def main(number=10):
+    outputs, errors = loop(RECORDS)
+    results = SCHEMA.validate_many(RECORDS)
+    assert results.outputs == outputs and results.errors.keys() == errors.keys()
+    timings = {}
+    for name, func in (('__call__ loop', loop), ('validate_many', SCHEMA.validate_many)):
+        timings[name] = min(timeit.repeat(lambda: func(RECORDS), number=number, repeat=5)) / number
+        print('%-14s %8.2f ms per 10k records' % (name, timings[name] * 1e3))
+    print('speedup        %8.2fx' % (timings['__call__ loop'] / timings['validate_many']))
+
+
+if __name__ == '__main__':
+    main()
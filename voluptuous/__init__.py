@@ -76,6 +76,7 @@ Validate like so:
 
 # flake8: noqa
 # fmt: off
+from voluptuous.async_schema import AsyncSchema
 from voluptuous.schema_builder import *
 from voluptuous.util import *
 from voluptuous.validators import *
@@ -0,0 +1,378 @@
+"""Asynchronous validation with :class:`AsyncSchema`.
+
+An :class:`AsyncSchema` accepts coroutine functions, and objects with an
+``async`` ``__call__``, wherever a validator function is accepted. Calling
+it returns a coroutine:
+
+    >>> import asyncio
+    >>> from voluptuous import Invalid, Required
+    >>> async def known_user(value):
+    ...     await asyncio.sleep(0)
+    ...     if value not in ('alice', 'bob'):
+    ...         raise Invalid('unknown user')
+    ...     return value
+    >>> validate = AsyncSchema({Required('owner'): known_user, 'reviewers': [known_user]})
+    >>> asyncio.run(validate({'owner': 'alice', 'reviewers': ['bob']}))
+    {'owner': 'alice', 'reviewers': ['bob']}
+
+Parts of the schema without coroutine validators are compiled exactly as
+by :class:`~voluptuous.schema_builder.Schema` and run synchronously. A
+dictionary or sequence containing coroutine validators is first validated
+synchronously, only starting the coroutine validators of its values. The
+started validators then run concurrently with :func:`asyncio.gather`, and
+their outputs and errors are merged into the result.
+
+Coroutine validators may be used as dictionary values, as the only item of
+a list or tuple schema, and inside `All` and `Any`. Anywhere else, such as
+in dictionary keys, `Msg`, `ExactSequence`, `Unordered` or a nested
+`Schema`, they raise `SchemaError`.
+"""
+from __future__ import annotations
+import asyncio
+import collections.abc
+import contextvars
+import inspect
+import typing
+from voluptuous import error as er
+from voluptuous import schema_builder as sb
+from voluptuous.validators import All, Any, ExactSequence, Unordered, _WithSubValidators
+_pending_validators: contextvars.ContextVar[typing.Optional[typing.List[_Pending]]] = contextvars.ContextVar('voluptuous_pending_validators', default=None)
+_concurrency_limit: contextvars.ContextVar[typing.Optional[asyncio.Semaphore]] = contextvars.ContextVar('voluptuous_concurrency_limit', default=None)
+
+class _Pending(object):
+    """A started coroutine validator, standing in for its output."""
+    __slots__ = ('awaitable', 'path')
+
+    def __init__(self, awaitable: typing.Coroutine, path: typing.List[typing.Hashable]) -> None:
+        self.awaitable = awaitable
+        self.path = path
+
+def _is_coroutine_validator(schema) -> bool:
+    if inspect.iscoroutinefunction(schema):
+        return True
+    return not inspect.isclass(schema) and inspect.iscoroutinefunction(getattr(schema, '__call__', None))
+
+def _contains_coroutines(schema, self_async: bool) -> bool:
+    """Return whether `schema` contains a coroutine validator.
+
+    `Self` counts as one if `self_async` is true.
+    """
+    if schema is sb.Self:
+        return self_async
+    if _is_coroutine_validator(schema):
+        return True
+    if isinstance(schema, sb.Schema):
+        return _contains_coroutines(schema.schema, False)
+    if isinstance(schema, collections.abc.Mapping):
+        return any((_contains_coroutines(k, self_async) or _contains_coroutines(v, self_async) for k, v in schema.items()))
+    if isinstance(schema, (list, tuple, set, frozenset)):
+        return any((_contains_coroutines(v, self_async) for v in schema))
+    if isinstance(schema, (_WithSubValidators, ExactSequence, Unordered)):
+        return any((_contains_coroutines(v, self_async) for v in schema.validators))
+    if isinstance(schema, sb.Marker):
+        return _contains_coroutines(schema.schema, self_async)
+    if isinstance(schema, sb.Msg):
+        return _contains_coroutines(schema._schema, self_async)
+    return False
+
+def _defer(validate: typing.Callable) -> typing.Callable:
+    """Adapt the coroutine validator `validate` to synchronous containers.
+
+    The returned validator starts `validate` and returns a `_Pending`
+    placeholder, registered with the enclosing container if any.
+    """
+
+    def validate_deferred(path, data):
+        pending = _Pending(validate(list(path), data), list(path))
+        collector = _pending_validators.get()
+        if collector is not None:
+            collector.append(pending)
+        return pending
+    return validate_deferred
+
+async def _resolve(output):
+    if type(output) is _Pending:
+        return await output.awaitable
+    return output
+
+def _substitute(output, resolved: typing.Dict[int, typing.Any]):
+    """Replace the `_Pending` placeholders in the container `output`."""
+    if isinstance(output, dict):
+        for key, value in output.items():
+            if type(value) is _Pending:
+                output[key] = resolved[id(value)]
+        return output
+    if isinstance(output, list):
+        for index, value in enumerate(output):
+            if type(value) is _Pending:
+                output[index] = resolved[id(value)]
+        return output
+    items = [resolved[id(value)] if type(value) is _Pending else value for value in output]
+    if sb._isnamedtuple(output):
+        return type(output)(*items)
+    return type(output)(items)
+
+def _cached_coroutine(cache: sb.LRU, validate: typing.Callable, token: typing.Hashable) -> typing.Callable:
+    """Memoize the outcomes of the coroutine validator `validate`, see `schema_builder._cached_validator`."""
+
+    async def validate_cached(path, data):
+        key = sb._cache_key(token, data)
+        if key is None:
+            return await validate(path, data)
+        entry = cache.get(key, sb._MISSING)
+        if entry is not sb._MISSING:
+            return sb._replay(entry, path, data)
+        try:
+            output = await validate([], data)
+        except er.Invalid as e:
+            sb._remember_error(cache, key, e, path)
+            raise
+        sb._remember(cache, key, data, output)
+        return output
+    return validate_cached
+
+class _AsyncCompiler(sb.Schema):
+    """The schema compiled for an :class:`AsyncSchema`.
+
+    Nodes containing coroutine validators compile to validators returning
+    a `_Pending` placeholder. The root validator may therefore return one,
+    which :class:`AsyncSchema` awaits.
+    """
+    _standard_scalars = True
+
+    def __init__(self, schema: sb.Schemable, required: bool=False, extra: int=sb.PREVENT_EXTRA, backend: str='closure', lazy: typing.Optional[bool]=None, max_errors: typing.Optional[int]=None, fail_fast: bool=False, cache: typing.Optional[sb.LRU]=None) -> None:
+        self._self_async = _contains_coroutines(schema, False)
+        super().__init__(schema, required=required, extra=extra, backend=backend, lazy=lazy, max_errors=max_errors, fail_fast=fail_fast, cache=cache)
+
+    def _cache_compiled(self, cache: sb.LRU, compiled: typing.Callable) -> typing.Callable:
+        if not self._self_async:
+            return super()._cache_compiled(cache, compiled)
+        return _defer(_cached_coroutine(cache, self._compile_async(self.schema), object()))
+
+    def _compile(self, schema):
+        if not _contains_coroutines(schema, self._self_async):
+            return super()._compile(schema)
+        return _defer(self._compile_async(schema))
+
+    def _compile_async(self, schema) -> typing.Callable:
+        """Compile `schema`, which contains coroutine validators, to a coroutine function."""
+        if schema is sb.Self:
+            root = self._root
+
+            async def validate_self(path, data):
+                return await _resolve(root._compiled(path, data))
+            return validate_self
+        if _is_coroutine_validator(schema):
+            return self._compile_coroutine(schema)
+        if isinstance(schema, collections.abc.Mapping) and (not isinstance(schema, sb.Object)):
+            if any((_contains_coroutines(key, self._self_async) for key in schema)):
+                raise er.SchemaError('coroutine validators are not supported in dictionary keys')
+            return self._gather_container(sb.Schema._compile(self, schema), 'dictionary value')
+        if type(schema) in (list, tuple) and len(schema) == 1:
+            return self._gather_container(sb.Schema._compile(self, schema), None)
+        if isinstance(schema, All) or (isinstance(schema, Any) and schema.discriminant is None):
+            return self._compile_sub_validators(schema)
+        raise er.SchemaError('coroutine validators are not supported in %r' % (schema,))
+
+    def _compile_coroutine(self, validator) -> typing.Callable:
+
+        async def validate_coroutine(path, data):
+            limit = _concurrency_limit.get()
+            try:
+                if limit is None:
+                    return await validator(data)
+                async with limit:
+                    return await validator(data)
+            except ValueError:
+                raise er.ValueInvalid('not a valid value', path)
+            except er.Invalid as e:
+                e.prepend(path)
+                raise
+        return validate_coroutine
+
+    def _compile_sub_validators(self, validator: _WithSubValidators) -> typing.Callable:
+        schema = typing.cast(_AsyncCompiler, self._with_required(validator.required))
+        funcs = [(True, schema._compile_async(v)) if _contains_coroutines(v, self._self_async) else (False, schema._compile(v)) for v in validator.validators]
+        msg = validator.msg
+        if isinstance(validator, All):
+
+            async def validate_all(path, value):
+                try:
+                    for is_async, func in funcs:
+                        value = await func(path, value) if is_async else func(path, value)
+                except er.Invalid as e:
+                    raise e if msg is None else er.AllInvalid(msg, path=path)
+                return value
+            return validate_all
+
+        async def validate_any(path, value):
+            error = None
+            for is_async, func in funcs:
+                try:
+                    return await func(path, value) if is_async else func(path, value)
+                except er.Invalid as e:
+                    if error is None or len(e.path) > len(error.path):
+                        error = e
+            if error:
+                raise error if msg is None else er.AnyInvalid(msg, path=path)
+            raise er.AnyInvalid(msg or 'no valid value found', path=path)
+        return validate_any
+
+    def _gather_container(self, validate: typing.Callable, error_type: typing.Optional[str]) -> typing.Callable:
+        """Run the container validator `validate`, then the coroutine validators it started."""
+        max_errors = self.max_errors
+
+        async def validate_container(path, data):
+            pending: typing.List[_Pending] = []
+            token = _pending_validators.set(pending)
+            failed = False
+            try:
+                output = validate(path, data)
+                errors = []
+            except er.Invalid as e:
+                failed = True
+                errors = list(e.errors) if isinstance(e, er.MultipleInvalid) else [e]
+            except BaseException:
+                for started in pending:
+                    started.awaitable.close()
+                raise
+            finally:
+                _pending_validators.reset(token)
+            if pending:
+                outcomes = await asyncio.gather(*[started.awaitable for started in pending], return_exceptions=True)
+                resolved = {}
+                for started, outcome in zip(pending, outcomes):
+                    if isinstance(outcome, er.Invalid):
+                        for err in outcome.errors if isinstance(outcome, er.MultipleInvalid) else [outcome]:
+                            if error_type is not None and len(err.path) <= len(started.path):
+                                err.error_type = error_type
+                            errors.append(err)
+                    elif isinstance(outcome, BaseException):
+                        raise outcome
+                    else:
+                        resolved[id(started)] = outcome
+                if not failed and (not errors):
+                    output = _substitute(output, resolved)
+            if errors:
+                raise er.MultipleInvalid(errors[:max_errors])
+            return output
+        return validate_container
+
+class AsyncSchema(object):
+    """A schema whose validators may be coroutine functions.
+
+    Calling the schema, :meth:`is_valid`, :meth:`validate_many` and
+    :meth:`iter_validate` are coroutines. The schema is compiled by a
+    :class:`~voluptuous.schema_builder.Schema` subclass, but `AsyncSchema`
+    is not one itself, since its methods cannot be used synchronously.
+
+    :param concurrency: Run at most this many coroutine validators at once
+        in one validation, or one :meth:`validate_many` batch.
+
+    Other parameters are the same as for :class:`~voluptuous.schema_builder.Schema`.
+    With `cache`, coroutine validators must be declared pure too.
+    """
+
+    def __init__(self, schema: sb.Schemable, required: bool=False, extra: int=sb.PREVENT_EXTRA, backend: str='closure', lazy: typing.Optional[bool]=None, max_errors: typing.Optional[int]=None, fail_fast: bool=False, concurrency: typing.Optional[int]=None, cache: typing.Optional[sb.LRU]=None) -> None:
+        if concurrency is not None and concurrency < 1:
+            raise er.SchemaError('concurrency must be at least 1')
+        self.concurrency = concurrency
+        self._schema = _AsyncCompiler(schema, required=required, extra=extra, backend=backend, lazy=lazy, max_errors=max_errors, fail_fast=fail_fast, cache=cache)
+
+    @property
+    def schema(self) -> sb.Schemable:
+        return self._schema.schema
+
+    @property
+    def required(self) -> bool:
+        return self._schema.required
+
+    @property
+    def extra(self) -> int:
+        return self._schema.extra
+
+    @property
+    def max_errors(self) -> typing.Optional[int]:
+        return self._schema.max_errors
+
+    @property
+    def cache(self) -> typing.Optional[sb.LRU]:
+        return self._schema.cache
+
+    def __eq__(self, other):
+        return isinstance(other, AsyncSchema) and other.schema == self.schema
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return str(self.schema)
+
+    def __repr__(self):
+        return '<AsyncSchema(%s, extra=%s, required=%s) object at 0x%x>' % (self.schema, self._schema._extra_to_name.get(self.extra, '??'), self.required, id(self))
+
+    async def __call__(self, data):
+        """Validate data against this schema."""
+        token = None
+        if self.concurrency is not None and _concurrency_limit.get() is None:
+            token = _concurrency_limit.set(asyncio.Semaphore(self.concurrency))
+        try:
+            return await _resolve(self._schema._resolve_compiled()([], data))
+        except er.MultipleInvalid:
+            raise
+        except er.Invalid as e:
+            raise er.MultipleInvalid([e])
+        finally:
+            if token is not None:
+                _concurrency_limit.reset(token)
+
+    def extend(self, schema: sb.Schemable, required: typing.Optional[bool]=None, extra: typing.Optional[int]=None) -> AsyncSchema:
+        """Create a new `AsyncSchema` by merging this and the provided `schema`, see :meth:`Schema.extend`."""
+        extended = self._schema.extend(schema, required=required, extra=extra)
+        inner = self._schema
+        return type(self)(extended.schema, required=extended.required, extra=extended.extra, backend=inner.backend, lazy=inner.lazy, max_errors=inner.max_errors, concurrency=self.concurrency, cache=inner.cache)
+
+    async def is_valid(self, data) -> bool:
+        """Return whether `data` is valid against this schema."""
+        try:
+            await self(data)
+        except er.Invalid:
+            return False
+        return True
+
+    async def validate_many(self, items: typing.Iterable) -> sb.ValidationResults:
+        """Validate each item of `items` concurrently, see :meth:`Schema.validate_many`."""
+        token = None
+        if self.concurrency is not None and _concurrency_limit.get() is None:
+            token = _concurrency_limit.set(asyncio.Semaphore(self.concurrency))
+        try:
+            outcomes = await asyncio.gather(*[self(item) for item in items], return_exceptions=True)
+        finally:
+            if token is not None:
+                _concurrency_limit.reset(token)
+        outputs = {}
+        errors = {}
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, er.MultipleInvalid):
+                errors[index] = outcome
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                outputs[index] = outcome
+        return sb.ValidationResults(outputs, errors)
+
+    async def iter_validate(self, items: typing.Iterable, max_failures: typing.Optional[int]=None) -> typing.AsyncIterator[typing.Tuple[int, typing.Any]]:
+        """Validate `items` one at a time, see :meth:`Schema.iter_validate`."""
+        if max_failures is not None and max_failures < 1:
+            raise ValueError('max_failures must be at least 1')
+        failures = 0
+        for index, data in enumerate(items):
+            try:
+                output = await self(data)
+            except er.MultipleInvalid as e:
+                yield (index, e)
+                failures += 1
+                if failures == max_failures:
+                    return
+            else:
+                yield (index, output)
@@ -0,0 +1,168 @@
+"""Code-generating backend for :class:`~voluptuous.schema_builder.Schema`.
+
+The default backend compiles a schema into a tree of nested closures. For
+dictionary schemas this means several Python calls per key: the key
+validator, the value validator and the candidate iteration. The code
+generating backend instead emits the source of one specialised function per
+dictionary node, with constant keys, ``isinstance`` checks and literal
+comparisons inlined, and ``exec`` s it once at compile time.
+
+Only dictionaries whose keys are literals (optionally wrapped in
+``Required``/``Optional``) are generated. Anything else, including the values
+the generator cannot inline, is compiled by the closure backend so outputs
+and errors are identical between the two.
+
+    >>> from voluptuous import MultipleInvalid, Required, Schema, raises
+    >>> validate = Schema({Required('name'): str, 'age': int}, backend='codegen')
+    >>> validate({'name': 'Alice', 'age': 30})
+    {'name': 'Alice', 'age': 30}
+    >>> with raises(MultipleInvalid, "expected int for dictionary value @ data['age']"):
+    ...   validate({'name': 'Alice', 'age': 'thirty'})
+"""
+from __future__ import annotations
+import collections
+import inspect
+import typing
+from voluptuous import error as er
+from voluptuous import schema_builder as sb
+_LINEAR_DISPATCH_LIMIT = 8
+
+def _collect_errors(errors, new_errors, depth, invalid_msg):
+    for err in new_errors:
+        if len(err.path) <= depth:
+            err.error_type = invalid_msg
+        errors.append(err)
+
+def compile_dict(schema: sb.Schema, mapping: typing.Mapping) -> typing.Optional[typing.Callable]:
+    """Generate a validator for ``mapping``, or return None if unsupported."""
+    generator = _Generator(schema)
+    if not generator.supports(mapping):
+        return None
+    name = generator.emit_dict(mapping)
+    return generator.build(name)
+
+class _Generator(object):
+    """Accumulates the source and namespace of one generated module."""
+
+    def __init__(self, schema: sb.Schema) -> None:
+        self.schema = schema
+        self.lines: typing.List[str] = []
+        self.namespace: typing.Dict[str, typing.Any] = {'DictInvalid': er.DictInvalid, 'Invalid': er.Invalid, 'MultipleInvalid': er.MultipleInvalid, 'RequiredFieldInvalid': er.RequiredFieldInvalid, 'ScalarInvalid': er.ScalarInvalid, 'TypeInvalid': er.TypeInvalid, '_collect_errors': _collect_errors, '_copy_items': sb._copy_items}
+        self._counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+        return '%s_%d' % (prefix, self._counter)
+
+    def const(self, value, prefix: str='c') -> str:
+        name = self._name(prefix)
+        self.namespace[name] = value
+        return name
+
+    def supports(self, mapping) -> bool:
+        if not isinstance(mapping, collections.abc.Mapping) or isinstance(mapping, sb.Object):
+            return False
+        for key in mapping:
+            if type(key) in sb.primitive_types:
+                continue
+            if type(key) in (sb.Marker, sb.Required, sb.Optional) and type(key.schema) in sb.primitive_types:
+                continue
+            return False
+        return True
+
+    def build(self, name: str) -> typing.Callable:
+        source = '\n'.join(self.lines) + '\n'
+        exec(compile(source, '<voluptuous-codegen>', 'exec'), self.namespace)
+        func = self.namespace[name]
+        func.__source__ = source
+        return func
+
+    def emit_dict(self, mapping) -> str:
+        """Emit a function validating ``mapping`` and return its name."""
+        schema = self.schema
+        invalid_msg = 'dictionary value'
+        required_keys = set((key for key in mapping if schema.required and (not isinstance(key, sb.Optional)) or isinstance(key, sb.Required)))
+        default_keys = set((key for key in mapping if isinstance(key, sb.Required) or isinstance(key, sb.Optional)))
+        slots = {}
+        for index, key in enumerate(mapping):
+            slots[key.schema if isinstance(key, sb.Marker) else key] = index
+        found = {key: self._name('found') for key in required_keys}
+        bodies = []
+        for key, value in mapping.items():
+            body = self._emit_value(value, invalid_msg)
+            if key in found:
+                body = body + [found[key] + ' = True']
+            bodies.append(body)
+        name = self._name('validate_dict')
+        lines = ['def %s(path, data):' % name, '    if not isinstance(data, dict):', "        raise DictInvalid('expected a dictionary', path)", '    out = None', '    errors = []']
+        lines.extend(('    %s = False' % flag for flag in found.values()))
+        lines.append('    for index, (key, value) in enumerate(data.items()):')
+        if schema.max_errors is not None:
+            lines.append('        if len(errors) >= %d:' % schema.max_errors)
+            lines.append('            break')
+        lines.append('        slot = %s.get(key)' % self.const(slots, 'slots'))
+        lines.append('        if slot is None:')
+        lines.extend(('            ' + line for line in self._emit_extra()))
+        if bodies:
+            lines.append('        else:')
+            lines.extend(('            ' + line for line in self._emit_dispatch(bodies, 0, len(bodies))))
+        for key in default_keys:
+            if isinstance(key.default, sb.Undefined):
+                continue
+            lines.append('    if %s not in data:' % self.const(key.schema, 'key'))
+            lines.append('        if out is None:')
+            lines.append('            out = _copy_items(data, len(data))')
+            lines.append('        key = %s' % self.const(key.schema, 'key'))
+            lines.append('        value = %s()' % self.const(key.default, 'default'))
+            lines.extend(('        ' + line for line in bodies[slots[key.schema]]))
+        for key, flag in found.items():
+            msg = key.msg if hasattr(key, 'msg') and key.msg else 'required key not provided'
+            lines.append('    if not %s:' % flag)
+            lines.append('        errors.append(RequiredFieldInvalid(%r, path + [%s]))' % (msg, self.const(key, 'key')))
+        lines.extend(['    if errors:', '        raise MultipleInvalid(errors[:%r])' % (schema.max_errors,), '    return data if out is None else out', ''])
+        self.lines.extend(lines)
+        return name
+
+    def _emit_extra(self) -> typing.List[str]:
+        if self.schema.extra == sb.ALLOW_EXTRA:
+            return ['if out is not None:', '    out[key] = value']
+        if self.schema.extra == sb.REMOVE_EXTRA:
+            return ['if out is None:', '    out = _copy_items(data, index)']
+        return ["errors.append(Invalid('extra keys not allowed', path + [key]))"]
+
+    def _emit_dispatch(self, bodies, lo: int, hi: int) -> typing.List[str]:
+        """Emit a balanced ``if`` tree selecting ``bodies[slot]``."""
+        if hi - lo == 1:
+            return bodies[lo]
+        if hi - lo <= _LINEAR_DISPATCH_LIMIT:
+            lines = []
+            for index in range(lo, hi):
+                if index == hi - 1:
+                    lines.append('else:')
+                else:
+                    lines.append('%s slot == %d:' % ('if' if index == lo else 'elif', index))
+                lines.extend(('    ' + line for line in bodies[index]))
+            return lines
+        mid = (lo + hi) // 2
+        lines = ['if slot < %d:' % mid]
+        lines.extend(('    ' + line for line in self._emit_dispatch(bodies, lo, mid)))
+        lines.append('else:')
+        lines.extend(('    ' + line for line in self._emit_dispatch(bodies, mid, hi)))
+        return lines
+
+    def _emit_value(self, value, invalid_msg: str) -> typing.List[str]:
+        """Emit statements validating ``value`` and storing it into ``out``.
+
+        ``out`` stays None while every value is returned unchanged and is
+        copied from ``data`` on the first one that is not.
+        """
+        if type(value) in sb.primitive_types or value is None:
+            return ['if value != %s:' % self.const(value), "    errors.append(ScalarInvalid('not a valid value', path + [key], None, %r))" % invalid_msg, 'elif out is not None:', '    out[key] = value']
+        if inspect.isclass(value) and (not hasattr(value, '__voluptuous_compile__')):
+            msg = 'expected %s' % value.__name__
+            return ['if not isinstance(value, %s):' % self.const(value, 'type'), '    errors.append(TypeInvalid(%r, path + [key], None, %r))' % (msg, invalid_msg), 'elif out is not None:', '    out[key] = value']
+        if self.supports(value) and (not hasattr(value, '__voluptuous_compile__')):
+            validator = self.emit_dict(value)
+        else:
+            validator = self.const(self.schema._compile(value), 'validator')
+        return ['path.append(key)', 'try:', '    cval = %s(path, value)' % validator, 'except MultipleInvalid as e:', '    _collect_errors(errors, e.errors, len(path), %r)' % invalid_msg, 'except Invalid as e:', '    _collect_errors(errors, [e], len(path), %r)' % invalid_msg, 'else:', '    if out is None and cval is not value:', '        out = _copy_items(data, index)', '    if out is not None:', '        out[key] = cval', 'finally:', '    path.pop()']
@@ -1,3 +1,4 @@
+from __future__ import annotations
 import typing
 
 class Error(Exception):
@@ -14,21 +15,114 @@ class Invalid(Error):
     :attr error_message: The actual error message that was raised, as a
         string.
 
+    The message may also be a callable taking no arguments, which is only
+    called the first time the message is needed. Validators use this to
+    avoid formatting messages for errors that end up being discarded. The
+    callable should only use values that do not change afterwards, so not
+    the data being validated.
+
+    >>> error = Invalid(lambda: 'expensive %s' % 'message')
+    >>> error.msg
+    'expensive message'
+
+    Errors can be pickled, and converted to and from plain dicts, for
+    example to send them as JSON:
+
+    >>> Invalid('expected int', ['a']).to_dict()
+    {'type': 'Invalid', 'message': 'expected int', 'path': ['a']}
+    >>> Invalid.from_dict({'type': 'TypeInvalid', 'message': 'expected int', 'path': ['a']})
+    TypeInvalid('expected int')
     """
 
-    def __init__(self, message: str, path: typing.Optional[typing.List[typing.Hashable]]=None, error_message: typing.Optional[str]=None, error_type: typing.Optional[str]=None) -> None:
+    def __init__(self, message: typing.Union[str, typing.Callable[[], str]], path: typing.Optional[typing.List[typing.Hashable]]=None, error_message: typing.Optional[str]=None, error_type: typing.Optional[str]=None) -> None:
         Error.__init__(self, message)
-        self._path = path or []
+        self._path = list(path) if path else []
         self._error_message = error_message or message
         self.error_type = error_type
 
+    def _render(self) -> None:
+        message, error_message = (self.args[0], self._error_message)
+        if callable(message):
+            self.args = (message(),) + self.args[1:]
+        if callable(error_message):
+            self._error_message = self.args[0] if error_message is message else error_message()
+
+    @property
+    def msg(self) -> str:
+        if callable(self.args[0]):
+            self._render()
+        return typing.cast(str, self.args[0])
+
+    @property
+    def path(self) -> typing.List[typing.Hashable]:
+        return self._path
+
+    @property
+    def error_message(self) -> str:
+        if callable(self._error_message):
+            self._render()
+        return typing.cast(str, self._error_message)
+
+    def __repr__(self) -> str:
+        self._render()
+        return Exception.__repr__(self)
+
+    def __reduce__(self):
+        return (_restore, (self._state({}),))
+
+    def _state(self, strings: typing.Dict[str, str]) -> tuple:
+        message = self.msg
+        intern = strings.setdefault
+        error_message = self.error_message
+        error_type = self.error_type
+        attrs = None if len(self.__dict__) == len(_STATE_ATTRS) else {k: v for k, v in self.__dict__.items() if k not in _STATE_ATTRS}
+        return (type(self), intern(message, message), self._path, None if error_message == message else error_message, error_type and intern(error_type, error_type), attrs)
+
+    @classmethod
+    def _from_state(cls, state: tuple) -> Invalid:
+        message, path, error_message, error_type, attrs = state
+        error = cls.__new__(cls)
+        error.args = (message,)
+        error._path = path
+        error._error_message = message if error_message is None else error_message
+        error.error_type = error_type
+        if attrs:
+            error.__dict__.update(attrs)
+        return error
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """Return this error as a dict of plain values."""
+        data = {'type': type(self).__name__, 'message': self.msg, 'path': list(self.path)}
+        if self.error_message != data['message']:
+            data['error_message'] = self.error_message
+        if self.error_type is not None:
+            data['error_type'] = self.error_type
+        return data
+
+    @classmethod
+    def from_dict(cls, data: typing.Dict[str, typing.Any]) -> Invalid:
+        """Rebuild an error from the output of :meth:`to_dict`.
+
+        The error class is looked up by name among the subclasses of
+        `Invalid`, falling back to `cls` for unknown names.
+        """
+        return _error_class(data['type'], cls)._from_dict(data)
+
+    @classmethod
+    def _from_dict(cls, data: typing.Dict[str, typing.Any]) -> Invalid:
+        return cls._from_state((data['message'], list(data['path']), data.get('error_message'), data.get('error_type'), None))
+
     def __str__(self) -> str:
         path = ' @ data[%s]' % ']['.join(map(repr, self.path)) if self.path else ''
+        self._render()
         output = Exception.__str__(self)
         if self.error_type:
             output += ' for ' + self.error_type
         return output + path
 
+    def prepend(self, path: typing.List[typing.Hashable]) -> None:
+        self._path = path + self.path
+
 class MultipleInvalid(Invalid):
 
     def __init__(self, errors: typing.Optional[typing.List[Invalid]]=None) -> None:
@@ -37,10 +131,45 @@ class MultipleInvalid(Invalid):
     def __repr__(self) -> str:
         return 'MultipleInvalid(%r)' % self.errors
 
+    def __reduce__(self):
+        return (_restore, (self._state({}),))
+
+    def _state(self, strings: typing.Dict[str, str]) -> tuple:
+        return (type(self), [error._state(strings) for error in self.errors])
+
+    @classmethod
+    def _from_state(cls, state: tuple) -> MultipleInvalid:
+        return cls([_restore(error) for error in state[0]])
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """Return the errors as a dict of plain values."""
+        return {'type': type(self).__name__, 'errors': [error.to_dict() for error in self.errors]}
+
+    @classmethod
+    def _from_dict(cls, data: typing.Dict[str, typing.Any]) -> MultipleInvalid:
+        return cls([Invalid.from_dict(error) for error in data['errors']])
+
+    @property
+    def msg(self) -> str:
+        return self.errors[0].msg
+
+    @property
+    def path(self) -> typing.List[typing.Hashable]:
+        return self.errors[0].path
+
+    @property
+    def error_message(self) -> str:
+        return self.errors[0].error_message
+
+    def add(self, error: Invalid) -> None:
+        self.errors.append(error)
+
     def __str__(self) -> str:
-        if not self.errors:
-            return "No errors"
-        return '\n'.join(str(error) for error in self.errors)
+        return str(self.errors[0])
+
+    def prepend(self, path: typing.List[typing.Hashable]) -> None:
+        for error in self.errors:
+            error.prepend(path)
 
 class RequiredFieldInvalid(Invalid):
     """Required field was missing."""
@@ -139,3 +268,17 @@ class NotEnoughValid(Invalid):
 class TooManyValid(Invalid):
     """The value passed more than expected validations."""
     pass
+_STATE_ATTRS = frozenset(('_path', '_error_message', 'error_type'))
+_error_classes: typing.Dict[str, typing.Type[Invalid]] = {}
+
+def _restore(state: tuple) -> Invalid:
+    return state[0]._from_state(state[1:])
+
+def _error_class(name: str, default: typing.Type[Invalid]) -> typing.Type[Invalid]:
+    if name not in _error_classes:
+        pending = [Invalid]
+        while pending:
+            cls = pending.pop()
+            _error_classes.setdefault(cls.__name__, cls)
+            pending.extend(cls.__subclasses__())
+    return _error_classes.get(name, default)
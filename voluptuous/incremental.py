@@ -0,0 +1,161 @@
+"""Incremental revalidation for :meth:`Schema.revalidate`.
+
+A document that passed validation and then had a few values changed only
+needs those values validated again, plus the structural checks of the
+dictionaries containing them: required keys, `Exclusive` and `Inclusive`
+groups and the extra key policy. Only dictionaries without `Remove` keys
+and single item list schemas are descended into. Any other schema on a
+changed path, such as `All` or a tuple, validates the whole value at that
+point.
+
+    >>> from voluptuous import MultipleInvalid, Required, Schema, raises
+    >>> validate = Schema({Required('name'): str, 'servers': [{Required('host'): str, 'port': int}]})
+    >>> document = validate({'name': 'prod', 'servers': [{'host': 'a', 'port': 1}, {'host': 'b'}]})
+    >>> document['servers'][1]['port'] = 2
+    >>> validate.revalidate(document, [['servers', 1, 'port']])
+    {'name': 'prod', 'servers': [{'host': 'a', 'port': 1}, {'host': 'b', 'port': 2}]}
+    >>> del document['name']
+    >>> with raises(MultipleInvalid, "required key not provided @ data['name']"):
+    ...   validate.revalidate(document, [['name']])
+"""
+from __future__ import annotations
+import itertools
+import typing
+from voluptuous import error as er
+from voluptuous import schema_builder as sb
+_CHANGED = object()
+
+def _path_tree(paths: typing.Iterable[typing.Sequence[typing.Hashable]]):
+    """Merge `paths` into nested dicts, with `_CHANGED` where a path ends."""
+    tree: typing.Dict[typing.Hashable, typing.Any] = {}
+    for path in paths:
+        path = list(path)
+        if not path:
+            return _CHANGED
+        node = tree
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+            if node is _CHANGED:
+                break
+        else:
+            node[path[-1]] = _CHANGED
+    return tree
+
+def _collect(errors: typing.List[er.Invalid], error: er.Invalid, path: typing.List[typing.Hashable], error_type: typing.Optional[str]=None) -> None:
+    for err in error.errors if isinstance(error, er.MultipleInvalid) else [error]:
+        if error_type is not None and len(err.path) <= len(path):
+            err.error_type = error_type
+        errors.append(err)
+
+class Revalidator(object):
+    """Compiled state for revalidating documents against one schema.
+
+    Validators are compiled for each schema node the first time a changed
+    path goes through it, and reused afterwards.
+    """
+
+    def __init__(self, schema: sb.Schema) -> None:
+        self.schema = schema
+        self._validators: typing.Dict[int, typing.Tuple[typing.Any, typing.Callable]] = {}
+        self._mappings: typing.Dict[int, tuple] = {}
+
+    def revalidate(self, document, paths: typing.Iterable[typing.Sequence[typing.Hashable]]):
+        tree = _path_tree(paths)
+        if not tree:
+            return document
+        try:
+            return self._walk(self.schema.schema, None, document, [], tree)
+        except er.MultipleInvalid:
+            raise
+        except er.Invalid as e:
+            raise er.MultipleInvalid([e])
+
+    def _validator(self, node) -> typing.Callable:
+        entry = self._validators.get(id(node))
+        if entry is None:
+            entry = self._validators[id(node)] = (node, self.schema._compile(node))
+        return entry[1]
+
+    def _mapping(self, node) -> tuple:
+        entry = self._mappings.get(id(node))
+        if entry is None:
+            if any((isinstance(key, sb.Remove) for key in node)):
+                entry = self._mappings[id(node)] = (node, None, None, None, None)
+                return entry[1:]
+            shallow = self.schema._compile({key: sb.Extra for key in node})
+            candidates_by_key, type_candidates = self.schema._compile_mapping_candidates(node)[2:]
+            defaults = {key.schema for key in node if isinstance(key, (sb.Required, sb.Optional)) and (not isinstance(key.default, sb.Undefined))}
+            entry = self._mappings[id(node)] = (node, shallow, candidates_by_key, type_candidates, defaults)
+        return entry[1:]
+
+    def _walk(self, node, compiled: typing.Optional[typing.Callable], value, path: typing.List[typing.Hashable], tree):
+        while node is sb.Self:
+            node = self.schema._root.schema
+            compiled = None
+        if tree is not _CHANGED:
+            if type(node) is dict and type(value) is dict:
+                return self._walk_mapping(node, value, path, tree)
+            if type(node) is list and len(node) == 1 and (node[0] is not sb.Extra) and (not isinstance(node[0], sb.Remove)) and (type(value) is list):
+                return self._walk_list(node[0], value, path, tree)
+        return (compiled or self._validator(node))(path, value)
+
+    def _walk_mapping(self, node, value, path, tree):
+        shallow, candidates_by_key, type_candidates, defaults = self._mapping(node)
+        if shallow is None:
+            return self._validator(node)(path, value)
+        errors: typing.List[er.Invalid] = []
+        out = None
+        try:
+            out = shallow(path, value)
+        except er.Invalid as e:
+            _collect(errors, e, path)
+        if out is not None and out is not value:
+            added = out.keys() - value.keys()
+            if not added <= defaults:
+                return self._validator(node)(path, value)
+            if added:
+                tree = {**tree, **dict.fromkeys(added, _CHANGED)}
+        source = value if out is None else out
+        for key, subtree in tree.items():
+            if key not in source:
+                continue
+            key_path = path + [key]
+            for _, skey, (ckey, cvalue) in itertools.chain(candidates_by_key.get(key, []), type_candidates(type(key), key)[0]):
+                try:
+                    ckey(key_path, key)
+                except er.Invalid:
+                    continue
+                try:
+                    result = self._walk(node[skey], cvalue, source[key], key_path, subtree)
+                except er.Invalid as e:
+                    _collect(errors, e, key_path, 'dictionary value')
+                    break
+                if out is not None and result is not out[key]:
+                    if out is value:
+                        out = type(value)(value)
+                    out[key] = result
+                break
+        if errors:
+            raise er.MultipleInvalid(errors[:self.schema.max_errors])
+        return out
+
+    def _walk_list(self, element, value, path, tree):
+        errors: typing.List[er.Invalid] = []
+        out = value
+        compiled = self._validator(element)
+        for index, subtree in tree.items():
+            if type(index) is not int or not 0 <= index < len(value):
+                continue
+            index_path = path + [index]
+            try:
+                result = self._walk(element, compiled, value[index], index_path, subtree)
+            except er.Invalid as e:
+                _collect(errors, e, index_path)
+                continue
+            if result is not out[index]:
+                if out is value:
+                    out = list(value)
+                out[index] = result
+        if errors:
+            raise er.MultipleInvalid(errors[:self.schema.max_errors])
+        return out
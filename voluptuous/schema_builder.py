@@ -1,19 +1,29 @@
 from __future__ import annotations
 import collections
+import concurrent.futures
+import copy
 import inspect
 import itertools
+import os
+import pickle
 import re
 import sys
+import threading
 import typing
 from collections.abc import Generator
 from contextlib import contextmanager
-from functools import cache, wraps
+from functools import partial, wraps
 from voluptuous import error as er
 from voluptuous.error import Error
+if typing.TYPE_CHECKING:
+    from voluptuous.incremental import Revalidator
 PREVENT_EXTRA = 0
 ALLOW_EXTRA = 1
 REMOVE_EXTRA = 2
 
+def _isnamedtuple(obj):
+    return isinstance(obj, tuple) and hasattr(obj, '_fields')
+
 class Undefined(object):
 
     def __nonzero__(self):
@@ -22,15 +32,74 @@ class Undefined(object):
     def __repr__(self):
         return '...'
 UNDEFINED = Undefined()
+
+def Self() -> None:
+    raise er.SchemaError('"Self" should never be called')
 DefaultFactory = typing.Union[Undefined, typing.Callable[[], typing.Any]]
 
+def _default_value(value):
+    return value
+
+def default_factory(value) -> DefaultFactory:
+    if value is UNDEFINED or callable(value):
+        return value
+    return partial(_default_value, value)
+
+@contextmanager
+def raises(exc, msg: typing.Optional[str]=None, regex: typing.Optional[re.Pattern]=None) -> Generator[None, None, None]:
+    try:
+        yield
+    except exc as e:
+        if msg is not None:
+            assert str(e) == msg, '%r != %r' % (str(e), msg)
+        if regex is not None:
+            assert re.search(regex, str(e)), '%r does not match %r' % (str(e), regex)
+    else:
+        raise AssertionError(f'Did not raise exception {exc.__name__}')
+
 def Extra(_) -> None:
     """Allow keys in the data that are not present in the schema."""
-    return lambda _: True
+    raise er.SchemaError('"Extra" should never be called')
 extra = Extra
 primitive_types = (bool, bytes, int, str, float, complex)
 Schemable = typing.Union['Schema', 'Object', collections.abc.Mapping, list, tuple, frozenset, set, bool, bytes, int, str, float, complex, type, object, dict, None, typing.Callable]
 
+_lazy_compile_lock = threading.RLock()
+_parallel_schema: typing.Optional[Schema] = None
+
+def _init_parallel_worker(payload: bytes) -> None:
+    global _parallel_schema
+    _parallel_schema = pickle.loads(payload)
+
+def _validate_chunk(chunk: typing.List) -> typing.List:
+    assert _parallel_schema is not None
+    return [outcome for _, outcome in _parallel_schema.iter_validate(chunk)]
+
+class ValidationResults(object):
+    """The outcome of :meth:`Schema.validate_many`.
+
+    :attr outputs: Validated outputs, keyed by the index of their input.
+    :attr errors: A :class:`~voluptuous.error.MultipleInvalid` for each
+        invalid input, keyed by its index.
+    """
+
+    def __init__(self, outputs: typing.Dict[int, typing.Any], errors: typing.Dict[int, er.MultipleInvalid]) -> None:
+        self.outputs = outputs
+        self.errors = errors
+
+    def __len__(self) -> int:
+        return len(self.outputs) + len(self.errors)
+
+    def __bool__(self) -> bool:
+        return not self.errors
+
+    def __repr__(self):
+        return '<ValidationResults(valid=%d, invalid=%d)>' % (len(self.outputs), len(self.errors))
+
+    def valid(self) -> typing.List[typing.Any]:
+        """Return the outputs of the valid inputs, in input order."""
+        return [self.outputs[index] for index in sorted(self.outputs)]
+
 class Schema(object):
     """A validation schema.
 
@@ -53,8 +122,9 @@ class Schema(object):
 
     """
     _extra_to_name = {REMOVE_EXTRA: 'REMOVE_EXTRA', ALLOW_EXTRA: 'ALLOW_EXTRA', PREVENT_EXTRA: 'PREVENT_EXTRA'}
+    default_lazy = False
 
-    def __init__(self, schema: Schemable, required: bool=False, extra: int=PREVENT_EXTRA) -> None:
+    def __init__(self, schema: Schemable, required: bool=False, extra: int=PREVENT_EXTRA, backend: str='closure', lazy: typing.Optional[bool]=None, max_errors: typing.Optional[int]=None, fail_fast: bool=False, cache: typing.Optional[LRU]=None) -> None:
         """Create a new Schema.
 
         :param schema: Validation schema. See :module:`voluptuous` for details.
@@ -68,11 +138,43 @@ class Schema(object):
               from the output.
             - Any value other than the above defaults to
               :const:`~voluptuous.PREVENT_EXTRA`
+        :param backend: How the schema is compiled:
+            - ``'closure'``: build a tree of nested validator closures.
+            - ``'codegen'``: generate and ``exec`` a specialised function
+              for each dictionary node, see :mod:`voluptuous.codegen`.
+        :param lazy: Defer compilation to the first validation. Schema errors
+            are then also raised on first use. Defaults to
+            :attr:`Schema.default_lazy`.
+        :param max_errors: Stop validating a dictionary, sequence or set once
+            this many errors were collected in it, and raise them. Nested
+            errors count towards the budget of their enclosing containers.
+        :param fail_fast: Shorthand for ``max_errors=1``.
+        :param cache: An :class:`LRU` memoizing validation outcomes by the
+            structure of the data, see :func:`pure`. Only allowed if every
+            validator in the schema is pure.
         """
+        if backend not in ('closure', 'codegen'):
+            raise er.SchemaError('unknown schema backend %r' % (backend,))
+        if fail_fast:
+            max_errors = 1
+        if max_errors is not None and max_errors < 1:
+            raise er.SchemaError('max_errors must be at least 1')
+        if cache is not None and (not is_pure(schema)):
+            raise er.SchemaError('cache requires every validator in the schema to be pure')
         self.schema: typing.Any = schema
+        self.cache = cache
         self.required = required
         self.extra = int(extra)
-        self._compiled = self._compile(schema)
+        self.backend = backend
+        self.max_errors = max_errors
+        self.lazy = type(self).default_lazy if lazy is None else lazy
+        self._checker: typing.Optional[Schema] = None
+        self._revalidator: typing.Optional[Revalidator] = None
+        self._root = self
+        if self.lazy:
+            self._compiled = self._compile_on_first_call
+        else:
+            self._compiled = self._compile_schema()
 
     @classmethod
     def infer(cls, data, **kwargs) -> Schema:
@@ -102,16 +204,19 @@ class Schema(object):
 
         Note: only very basic inference is supported.
         """
-        if isinstance(data, dict):
-            return cls({k: cls.infer(v) for k, v in data.items()})
-        elif isinstance(data, list):
-            return [cls.infer(data[0])] if data else list
-        elif isinstance(data, tuple):
-            return tuple(cls.infer(item) for item in data)
-        elif isinstance(data, set):
-            return {cls.infer(next(iter(data)))} if data else set
-        else:
-            return type(data)
+
+        def value_to_schema_type(value):
+            if isinstance(value, dict):
+                if len(value) == 0:
+                    return dict
+                return {k: value_to_schema_type(v) for k, v in value.items()}
+            if isinstance(value, list):
+                if len(value) == 0:
+                    return list
+                else:
+                    return [value_to_schema_type(v) for v in value]
+            return type(value)
+        return cls(value_to_schema_type(data), **kwargs)
 
     def __eq__(self, other):
         if not isinstance(other, Schema):
@@ -127,6 +232,43 @@ class Schema(object):
     def __repr__(self):
         return '<Schema(%s, extra=%s, required=%s) object at 0x%x>' % (self.schema, self._extra_to_name.get(self.extra, '??'), self.required, id(self))
 
+    def _compile_schema(self):
+        if compile_cache.enabled:
+            compiled = compile_cache.compile(self)
+        else:
+            compiled = self._compile(self.schema)
+        if self.cache is not None:
+            compiled = self._cache_compiled(self.cache, compiled)
+        return compiled
+
+    def _cache_compiled(self, cache: LRU, compiled: typing.Callable) -> typing.Callable:
+        """Memoize the root validator `compiled` in `cache`."""
+        return _cached_validator(cache, compiled, object())
+
+    def _compile_on_first_call(self, path, data):
+        return self._resolve_compiled()(path, data)
+
+    def _resolve_compiled(self):
+        if self._compiled == self._compile_on_first_call:
+            with _lazy_compile_lock:
+                if self._compiled == self._compile_on_first_call:
+                    self._compiled = self._compile_schema()
+        return self._compiled
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_compiled']
+        state['_checker'] = None
+        state['_revalidator'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compiled = self._compile_on_first_call if self.lazy else self._compile_schema()
+
+    def __voluptuous_fingerprint__(self):
+        return (self.schema, self.required, self.extra, self.backend, self.max_errors, self.cache)
+
     def __call__(self, data):
         """Validate data against this schema."""
         try:
@@ -136,36 +278,386 @@ class Schema(object):
         except er.Invalid as e:
             raise er.MultipleInvalid([e])
 
+    def validate_many(self, items: typing.Iterable) -> ValidationResults:
+        """Validate each item of `items` and collect outputs and errors by index.
+
+        Unlike calling the schema in a loop, invalid items do not raise:
+
+        >>> results = Schema(int).validate_many([1, 'a', 3])
+        >>> results.outputs
+        {0: 1, 2: 3}
+        >>> results.errors
+        {1: MultipleInvalid([TypeInvalid('expected int')])}
+        """
+        compiled = self._resolve_compiled()
+        outputs = {}
+        errors = {}
+        path: typing.List[typing.Hashable] = []
+        for index, data in enumerate(items):
+            try:
+                outputs[index] = compiled(path, data)
+            except er.MultipleInvalid as e:
+                errors[index] = e
+            except er.Invalid as e:
+                errors[index] = er.MultipleInvalid([e])
+        return ValidationResults(outputs, errors)
+
+    def iter_validate(self, items: typing.Iterable, max_failures: typing.Optional[int]=None) -> typing.Iterator[typing.Tuple[int, typing.Any]]:
+        """Lazily validate `items`, yielding ``(index, output)`` for each one.
+
+        Invalid items yield ``(index, MultipleInvalid)`` instead. Items are
+        pulled from `items` one at a time and nothing is kept between them,
+        so arbitrarily long streams are validated in constant memory.
+
+        :param max_failures: Stop after yielding this many invalid items.
+
+        >>> list(Schema(int).iter_validate(iter([1, 'a', 3, 'b']), max_failures=1))
+        [(0, 1), (1, MultipleInvalid([TypeInvalid('expected int')]))]
+        """
+        if max_failures is not None and max_failures < 1:
+            raise ValueError('max_failures must be at least 1')
+        compiled = self._resolve_compiled()
+        path: typing.List[typing.Hashable] = []
+        failures = 0
+        for index, data in enumerate(items):
+            try:
+                output = compiled(path, data)
+            except er.Invalid as e:
+                if not isinstance(e, er.MultipleInvalid):
+                    e = er.MultipleInvalid([e])
+                yield (index, e)
+                failures += 1
+                if failures == max_failures:
+                    return
+            else:
+                yield (index, output)
+
+    def validate_parallel(self, items: typing.Iterable, workers: typing.Optional[int]=None, chunksize: int=1000) -> typing.Iterator[typing.Tuple[int, typing.Any]]:
+        """Validate `items` in a pool of worker processes.
+
+        Yields the same ``(index, output)`` and ``(index, MultipleInvalid)``
+        pairs as :meth:`iter_validate`, in input order. The schema is pickled
+        once and sent to each worker when it starts, so it must only use
+        validators that can be pickled, i.e. no lambdas or local functions.
+        Items are sent to the workers in chunks of `chunksize`, and only a
+        few chunks per worker are read ahead from `items`.
+
+        :param workers: Number of processes, defaults to the number of CPUs.
+        :param chunksize: Number of items validated per task.
+        """
+        if chunksize < 1:
+            raise ValueError('chunksize must be at least 1')
+        workers = workers or os.cpu_count() or 1
+        payload = pickle.dumps(self)
+        iterator = iter(items)
+        executor = concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_parallel_worker, initargs=(payload,))
+        pending: typing.Deque[typing.Tuple[int, concurrent.futures.Future]] = collections.deque()
+        start = 0
+        try:
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = list(itertools.islice(iterator, chunksize))
+                    if not chunk:
+                        break
+                    pending.append((start, executor.submit(_validate_chunk, chunk)))
+                    start += len(chunk)
+                if not pending:
+                    return
+                offset, future = pending.popleft()
+                for index, outcome in enumerate(future.result(), offset):
+                    yield (index, outcome)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _compile(self, schema):
+        if schema is Extra:
+            return lambda _, v: v
+        if schema is Self:
+            root = self._root
+            return lambda p, v: root._compiled(p, v)
+        elif hasattr(schema, '__voluptuous_compile__'):
+            return schema.__voluptuous_compile__(self)
+        if isinstance(schema, Object):
+            return self._compile_object(schema)
+        if isinstance(schema, collections.abc.Mapping):
+            return self._compile_dict(schema)
+        elif isinstance(schema, list):
+            return self._compile_list(schema)
+        elif isinstance(schema, tuple):
+            return self._compile_tuple(schema)
+        elif isinstance(schema, (frozenset, set)):
+            return self._compile_set(schema)
+        type_ = type(schema)
+        if inspect.isclass(schema):
+            type_ = schema
+        if type_ in (*primitive_types, object, type(None)) or callable(schema):
+            return _compile_scalar(schema)
+        raise er.SchemaError('unsupported schema data type %r' % type(schema).__name__)
+
+    def revalidate(self, document, paths: typing.Iterable[typing.Sequence[typing.Hashable]]):
+        """Validate `document` again after the values at `paths` changed.
+
+        `document` must have been valid against this schema before the
+        change. Only the changed values and the structure of the
+        dictionaries containing them are validated again, see
+        :mod:`voluptuous.incremental`.
+
+        :param paths: Key paths, such as ``['servers', 0, 'port']``, of the
+            values that were added, replaced or removed.
+        """
+        revalidator = self._revalidator
+        if revalidator is None:
+            from voluptuous import incremental
+            with _lazy_compile_lock:
+                if self._revalidator is None:
+                    self._revalidator = incremental.Revalidator(self)
+                revalidator = self._revalidator
+        return revalidator.revalidate(document, paths)
+
+    def _with_required(self, required: bool) -> Schema:
+        """Return a schema that compiles like this one with `required` changed.
+
+        Compilation never modifies a schema, so schemas and validators can
+        be compiled from several threads at once. `Self` in the returned
+        schema still refers to this one.
+        """
+        if required == self.required:
+            return self
+        derived = object.__new__(type(self))
+        derived.__dict__.update(self.__dict__)
+        derived.required = required
+        return derived
+
+    def is_valid(self, data) -> bool:
+        """Return whether `data` is valid against this schema.
+
+        Validation uses a :class:`CheckSchema` compiled on first use, which
+        stops at the first error and does not copy valid containers.
+        Subclasses overriding a ``_compile`` method validate as when called.
+
+        >>> validate = Schema({'a': [int]})
+        >>> validate.is_valid({'a': [1, 2]})
+        True
+        >>> validate.is_valid({'a': [1, 'b']})
+        False
+        """
+        checker = self._checker
+        if checker is None:
+            with _lazy_compile_lock:
+                if self._checker is None:
+                    if _overrides_compile(type(self)):
+                        self._checker = self
+                    else:
+                        self._checker = CheckSchema(self.schema, required=self.required, extra=self.extra)
+                checker = self._checker
+        try:
+            checker._compiled([], data)
+        except er.Invalid:
+            return False
+        return True
+
+    def _dispatch_key(self, schema):
+        """Describe which values `schema` can accept once compiled.
+
+        Returns ``('literal', value)`` if it only accepts values equal to
+        ``value``, ``('type', cls)`` if it accepts exactly the instances of
+        ``cls`` and ``('guard', cls)`` if it rejects anything that is not an
+        instance of ``cls``. Returns None when nothing is known, which is
+        always the case for schemas overriding :meth:`_compile`.
+
+        >>> Schema(int)._dispatch_key({'a': int})
+        ('guard', <class 'dict'>)
+        """
+        if not _standard_scalars(self):
+            return None
+        if schema is Extra or schema is Self or hasattr(schema, '__voluptuous_compile__') or isinstance(schema, Object):
+            return None
+        if isinstance(schema, collections.abc.Mapping):
+            return ('guard', dict)
+        if isinstance(schema, list):
+            return ('guard', list)
+        if isinstance(schema, tuple):
+            return ('guard', tuple)
+        if isinstance(schema, (set, frozenset)):
+            return ('guard', type(schema))
+        if inspect.isclass(schema):
+            return ('type', schema) if type(schema) is type else None
+        if (type(schema) in primitive_types or schema is None) and schema == schema:
+            return ('literal', schema)
+        return None
+
+    def _compile_mapping_candidates(self, schema):
+        """Compile the keys and values of a mapping schema.
+
+        Returns the required keys, the keys with defaults, the candidates
+        indexed by literal key and a function returning the remaining
+        candidates for a given key type.
+        """
+        all_required_keys = set((key for key in schema if key is not Extra and (self.required and (not isinstance(key, (Optional, Remove))) or isinstance(key, Required))))
+        all_default_keys = set((key for key in schema if isinstance(key, Required) or isinstance(key, Optional)))
+        _compiled_schema = {}
+        for skey, svalue in schema.items():
+            new_key = self._compile(skey)
+            new_value = self._compile(svalue)
+            _compiled_schema[skey] = (new_key, new_value)
+        candidates = list(_iterate_mapping_candidates(_compiled_schema))
+        additional_candidates = []
+        candidates_by_key = {}
+        for skey, (ckey, cvalue) in candidates:
+            if type(skey) in primitive_types:
+                candidates_by_key.setdefault(skey, []).append((-1, skey, (ckey, cvalue)))
+            elif isinstance(skey, Marker) and type(skey.schema) in primitive_types:
+                candidates_by_key.setdefault(skey.schema, []).append((-1, skey, (ckey, cvalue)))
+            else:
+                additional_candidates.append((skey, (ckey, cvalue)))
+        candidates_by_type = {}
+        fuse = _standard_scalars(self)
+
+        def type_candidates(key_type, key):
+            """Return the additional candidates that may accept `key`, of type `key_type`.
+
+            Plain type keys (eg. `{str: int}`) that cannot match are pruned. The
+            position and message of the first pruned key are returned too, so
+            the error reported for an unmatched key does not change.
+
+            Consecutive `Match` keys are fused, and only the first one matching
+            a string key is returned, or the first of the run if none does.
+            """
+            try:
+                relevant, pruned, runs = candidates_by_type[key_type]
+            except KeyError:
+                relevant = []
+                pruned = None
+                for position, (skey, (ckey, cvalue)) in enumerate(additional_candidates):
+                    if type(skey) is type and (not issubclass(key_type, skey)):
+                        if pruned is None:
+                            pruned = (position, 'expected %s' % skey.__name__)
+                        continue
+                    relevant.append((position, skey, (ckey, cvalue)))
+                runs = None
+                if fuse and issubclass(key_type, str):
+                    from voluptuous.validators import _fused_match_runs
+                    runs = _fused_match_runs([skey for _, skey, _ in relevant])
+                candidates_by_type[key_type] = (relevant, pruned, runs)
+            if runs:
+                selected = []
+                start = 0
+                for run_start, run_end, fused, members in runs:
+                    selected.extend(relevant[start:run_start])
+                    match = fused.match(key)
+                    selected.append(relevant[run_start if match is None else members[match.lastindex]])
+                    start = run_end
+                selected.extend(relevant[start:])
+                return (selected, pruned)
+            return (relevant, pruned)
+        return (all_required_keys, all_default_keys, candidates_by_key, type_candidates)
+
     def _compile_mapping(self, schema, invalid_msg=None):
         """Create validator for given mapping."""
         invalid_msg = invalid_msg or 'mapping value'
+        all_required_keys, all_default_keys, candidates_by_key, type_candidates = self._compile_mapping_candidates(schema)
+        max_errors = self.max_errors
 
         def validate_mapping(path, iterable, out):
-            if not isinstance(iterable, collections.abc.Mapping):
-                raise er.DictInvalid(invalid_msg)
-
-            for key, value in iterable.items():
-                schema_key = key
-                if key not in schema:
-                    if isinstance(key, str):
-                        schema_key = next((k for k in schema if isinstance(k, str) and k.lower() == key.lower()), None)
-                    if schema_key is None:
-                        if self.extra == PREVENT_EXTRA:
-                            raise er.Invalid(f'extra keys not allowed @ data[{key!r}]')
-                        if self.extra == REMOVE_EXTRA:
-                            continue
+            """Validate `iterable` items into `out`.
+
+            If `out` is None, `iterable` is the mapping itself, which is
+            returned as is unless a key or value is changed, added or
+            removed, in which case it is copied from that point on.
+            """
+            required_keys = all_required_keys.copy()
+            if out is None:
+                data = key_value_map = iterable
+                items = data.items()
+                defaults = {}
+                for key in all_default_keys:
+                    if not isinstance(key.default, Undefined) and key.schema not in data and (key.schema not in defaults):
+                        defaults[key.schema] = key.default()
+                if defaults:
+                    items = itertools.chain(items, defaults.items())
+                    out = data.__class__()
+            else:
+                data = None
+                key_value_map = type(out)()
+                for key, value in iterable:
+                    key_value_map[key] = value
+                for key in all_default_keys:
+                    if not isinstance(key.default, Undefined) and key.schema not in key_value_map:
+                        key_value_map[key.schema] = key.default()
+                items = key_value_map.items()
+            errors = []
+            for index, (key, value) in enumerate(items):
+                if max_errors is not None and len(errors) >= max_errors:
+                    break
+                path.append(key)
                 try:
-                    out[key] = schema[schema_key](path + [key], value)
-                except er.Invalid as e:
-                    raise er.MultipleInvalid([e])
-
-            if self.required:
-                for key in schema:
-                    if isinstance(key, Required) and key not in iterable:
-                        raise er.RequiredFieldInvalid(f'required key not provided @ data[{key!r}]')
-
-            return out
-
+                    remove_key = False
+                    type_relevant, pruned = type_candidates(type(key), key)
+                    relevant_candidates = itertools.chain(candidates_by_key.get(key, []), type_relevant)
+                    error = None
+                    full_error_position = None
+                    for position, skey, (ckey, cvalue) in relevant_candidates:
+                        try:
+                            new_key = ckey(path, key)
+                        except er.Invalid as e:
+                            if len(e.path) > len(path):
+                                raise
+                            if not error or len(e.path) > len(error.path):
+                                error = e
+                            if full_error_position is None and len(e.path) == len(path):
+                                full_error_position = position
+                            continue
+                        exception_errors = []
+                        is_remove = new_key is Remove
+                        try:
+                            cval = cvalue(path, value)
+                            if not is_remove:
+                                if out is None and (cval is not value or new_key is not key):
+                                    out = _copy_items(data, index)
+                                if out is not None:
+                                    out[new_key] = cval
+                            else:
+                                remove_key = True
+                                continue
+                        except er.MultipleInvalid as e:
+                            exception_errors.extend(e.errors)
+                        except er.Invalid as e:
+                            exception_errors.append(e)
+                        if exception_errors:
+                            if is_remove or remove_key:
+                                continue
+                            for err in exception_errors:
+                                if len(err.path) <= len(path):
+                                    err.error_type = invalid_msg
+                                errors.append(err)
+                            required_keys.discard(skey)
+                            break
+                        required_keys.discard(skey)
+                        break
+                    else:
+                        if pruned is not None and (full_error_position is None or pruned[0] < full_error_position):
+                            error = er.TypeInvalid(pruned[1], path)
+                        if remove_key:
+                            if out is None:
+                                out = _copy_items(data, index)
+                            continue
+                        elif self.extra == ALLOW_EXTRA:
+                            if out is not None:
+                                out[key] = value
+                        elif error:
+                            errors.append(error)
+                        elif self.extra != REMOVE_EXTRA:
+                            errors.append(er.Invalid('extra keys not allowed', path))
+                        elif out is None:
+                            out = _copy_items(data, index)
+                finally:
+                    path.pop()
+            for key in required_keys:
+                msg = key.msg if hasattr(key, 'msg') and key.msg else 'required key not provided'
+                errors.append(er.RequiredFieldInvalid(msg, path + [key]))
+            if errors:
+                raise er.MultipleInvalid(errors[:max_errors])
+            return data if out is None else out
         return validate_mapping
 
     def _compile_object(self, schema):
@@ -186,23 +678,15 @@ class Schema(object):
             ...   validate(Structure(one='three'))
 
         """
-        def validate_object(path, data):
-            if not isinstance(data, schema.cls):
-                raise er.ObjectInvalid('expected {} but got {}'.format(schema.cls.__name__, type(data).__name__))
-            
-            errors = []
-            for key, validator in schema.items():
-                if hasattr(data, key):
-                    try:
-                        setattr(data, key, validator(getattr(data, key)))
-                    except er.Invalid as e:
-                        errors.append(e)
-            
-            if errors:
-                raise er.MultipleInvalid(errors)
-            
-            return data
+        base_validate = self._compile_mapping(schema, invalid_msg='object value')
 
+        def validate_object(path, data):
+            if schema.cls is not UNDEFINED and (not isinstance(data, schema.cls)):
+                raise er.ObjectInvalid('expected a {0!r}'.format(schema.cls), path)
+            iterable = _iterate_object(data)
+            iterable = filter(lambda item: item[1] is not None, iterable)
+            out = base_validate(path, iterable, {})
+            return type(data)(**out)
         return validate_object
 
     def _compile_dict(self, schema):
@@ -281,7 +765,21 @@ class Schema(object):
          "expected str for dictionary value @ data['adict']['strfield']"]
 
         """
-        pass
+        if self.backend == 'codegen':
+            from voluptuous import codegen
+            generated = codegen.compile_dict(self, schema)
+            if generated is not None:
+                return generated
+        base_validate = self._compile_mapping(schema, invalid_msg='dictionary value')
+        validate_groups = _compile_groups(schema)
+
+        def validate_dict(path, data):
+            if not isinstance(data, dict):
+                raise er.DictInvalid('expected a dictionary', path)
+            if validate_groups is not None:
+                validate_groups(path, data)
+            return base_validate(path, data, None)
+        return validate_dict
 
     def _compile_sequence(self, schema, seq_type):
         """Validate a sequence type.
@@ -296,7 +794,51 @@ class Schema(object):
         >>> validator([1])
         [1]
         """
-        pass
+        _compiled = [self._compile(s) for s in schema]
+        seq_type_name = seq_type.__name__
+        max_errors = self.max_errors
+
+        def validate_sequence(path, data):
+            if not isinstance(data, seq_type):
+                raise er.SequenceTypeInvalid('expected a %s' % seq_type_name, path)
+            if not schema:
+                if data:
+                    raise er.MultipleInvalid([er.ValueInvalid('not a valid value', path if path else data)])
+                return data
+            out = None
+            invalid = None
+            errors = []
+            for i, value in enumerate(data):
+                invalid = None
+                path.append(i)
+                try:
+                    for validate in _compiled:
+                        try:
+                            cval = validate(path, value)
+                            if out is None and cval is not value:
+                                out = list(itertools.islice(data, i))
+                            if out is not None and cval is not Remove:
+                                out.append(cval)
+                            break
+                        except er.Invalid as e:
+                            if len(e.path) > len(path):
+                                raise
+                            invalid = e
+                    else:
+                        errors.append(invalid)
+                finally:
+                    path.pop()
+                if max_errors is not None and len(errors) >= max_errors:
+                    break
+            if errors:
+                raise er.MultipleInvalid(errors)
+            if out is None:
+                return data
+            if _isnamedtuple(data):
+                return type(data)(*out)
+            else:
+                return type(data)(out)
+        return _homogeneous_fast_path(self, schema, seq_type, validate_sequence)
 
     def _compile_tuple(self, schema):
         """Validate a tuple.
@@ -311,7 +853,7 @@ class Schema(object):
         >>> validator((1,))
         (1,)
         """
-        pass
+        return self._compile_sequence(schema, tuple)
 
     def _compile_list(self, schema):
         """Validate a list.
@@ -326,7 +868,7 @@ class Schema(object):
         >>> validator([1])
         [1]
         """
-        pass
+        return self._compile_sequence(schema, list)
 
     def _compile_set(self, schema):
         """Validate a set.
@@ -341,7 +883,31 @@ class Schema(object):
         >>> with raises(er.MultipleInvalid, 'invalid value in set'):
         ...   validator(set(['a']))
         """
-        pass
+        type_ = type(schema)
+        type_name = type_.__name__
+        _compiled = [self._compile(s) for s in schema]
+        max_errors = self.max_errors
+
+        def validate_set(path, data):
+            if not isinstance(data, type_):
+                raise er.Invalid('expected a %s' % type_name, path)
+            errors = []
+            for value in data:
+                for validate in _compiled:
+                    try:
+                        validate(path, value)
+                        break
+                    except er.Invalid:
+                        pass
+                else:
+                    invalid = er.Invalid('invalid value in %s' % type_name, path)
+                    errors.append(invalid)
+                    if max_errors is not None and len(errors) >= max_errors:
+                        break
+            if errors:
+                raise er.MultipleInvalid(errors)
+            return data
+        return validate_set
 
     def extend(self, schema: Schemable, required: typing.Optional[bool]=None, extra: typing.Optional[int]=None) -> Schema:
         """Create a new `Schema` by merging this and the provided `schema`.
@@ -356,7 +922,199 @@ class Schema(object):
         :param required: if set, overrides `required` of this `Schema`
         :param extra: if set, overrides `extra` of this `Schema`
         """
-        pass
+        assert isinstance(self.schema, dict) and isinstance(schema, dict), 'Both schemas must be dictionary-based'
+        result = self.schema.copy()
+
+        def key_literal(key):
+            return key.schema if isinstance(key, Marker) else key
+        result_key_map = dict(((key_literal(key), key) for key in result))
+        for key, value in schema.items():
+            if key_literal(key) in result_key_map:
+                result_key = result_key_map[key_literal(key)]
+                result_value = result[result_key]
+                if isinstance(result_value, dict) and isinstance(value, dict):
+                    new_value = Schema(result_value).extend(value).schema
+                    del result[result_key]
+                    result[key] = new_value
+                else:
+                    del result[result_key]
+                    result[key] = value
+            else:
+                result[key] = value
+        result_cls = type(self)
+        result_required = required if required is not None else self.required
+        result_extra = extra if extra is not None else self.extra
+        return result_cls(result, required=result_required, extra=result_extra, backend=self.backend, lazy=self.lazy, max_errors=self.max_errors, cache=self.cache)
+
+class CheckSchema(Schema):
+    """A schema compiled for checking validity rather than producing output.
+
+    Dictionaries and sequences stop at the first invalid value, which is
+    raised on its own instead of being collected into a `MultipleInvalid`.
+    A container whose values were all returned unchanged by their
+    validators is returned as is rather than copied.
+
+    >>> validate = CheckSchema({'a': [int]})
+    >>> data = {'a': [1, 2]}
+    >>> validate(data) is data
+    True
+    >>> with raises(er.MultipleInvalid, "expected int @ data['a'][1]"):
+    ...   validate({'a': [1, 'b']})
+    """
+
+    def __init__(self, schema: Schemable, required: bool=False, extra: int=PREVENT_EXTRA, backend: str='closure', lazy: typing.Optional[bool]=None, max_errors: typing.Optional[int]=1, cache: typing.Optional[LRU]=None) -> None:
+        super(CheckSchema, self).__init__(schema, required=required, extra=extra, backend=backend, lazy=lazy, max_errors=max_errors, cache=cache)
+        self._checker = self
+
+    def _compile_dict(self, schema):
+        all_required_keys, all_default_keys, candidates_by_key, type_candidates = self._compile_mapping_candidates(schema)
+        default_keys = [key for key in all_default_keys if not isinstance(key.default, Undefined)]
+        validate_groups = _compile_groups(schema)
+
+        def validate_dict(path, data):
+            if not isinstance(data, dict):
+                raise er.DictInvalid('expected a dictionary', path)
+            if validate_groups is not None:
+                validate_groups(path, data)
+            items = data.items()
+            out = None
+            if default_keys:
+                defaults = [(key.schema, key.default()) for key in default_keys if key.schema not in data]
+                if defaults:
+                    items = itertools.chain(items, defaults)
+                    out = data.__class__()
+            required_keys = all_required_keys.copy() if all_required_keys else None
+            for index, (key, value) in enumerate(items):
+                path.append(key)
+                try:
+                    type_relevant, pruned = type_candidates(type(key), key)
+                    error = None
+                    remove_key = False
+                    for position, skey, (ckey, cvalue) in itertools.chain(candidates_by_key.get(key, ()), type_relevant):
+                        try:
+                            new_key = ckey(path, key)
+                        except er.Invalid as e:
+                            if len(e.path) > len(path):
+                                raise
+                            if error is None:
+                                error = e
+                            continue
+                        is_remove = new_key is Remove
+                        try:
+                            cval = cvalue(path, value)
+                        except er.Invalid:
+                            if is_remove or remove_key:
+                                continue
+                            raise
+                        if is_remove:
+                            remove_key = True
+                            continue
+                        if required_keys:
+                            required_keys.discard(skey)
+                        if out is None and (cval is not value or new_key is not key):
+                            out = _copy_items(data, index)
+                        if out is not None:
+                            out[new_key] = cval
+                        break
+                    else:
+                        if not remove_key:
+                            if self.extra == ALLOW_EXTRA:
+                                if out is not None:
+                                    out[key] = value
+                                continue
+                            if error is not None or pruned is not None:
+                                raise error or er.TypeInvalid(pruned[1], path)
+                            if self.extra != REMOVE_EXTRA:
+                                raise er.Invalid('extra keys not allowed', path)
+                        if out is None:
+                            out = _copy_items(data, index)
+                finally:
+                    path.pop()
+            if required_keys:
+                key = next(iter(required_keys))
+                msg = key.msg if hasattr(key, 'msg') and key.msg else 'required key not provided'
+                raise er.RequiredFieldInvalid(msg, path + [key])
+            return data if out is None else out
+        return validate_dict
+
+    def _compile_sequence(self, schema, seq_type):
+        _compiled = [self._compile(s) for s in schema]
+        seq_type_name = seq_type.__name__
+
+        def validate_sequence(path, data):
+            if not isinstance(data, seq_type):
+                raise er.SequenceTypeInvalid('expected a %s' % seq_type_name, path)
+            if not schema:
+                if data:
+                    raise er.ValueInvalid('not a valid value', path if path else data)
+                return data
+            out = None
+            for i, value in enumerate(data):
+                path.append(i)
+                try:
+                    invalid = None
+                    for validate in _compiled:
+                        try:
+                            cval = validate(path, value)
+                        except er.Invalid as e:
+                            if len(e.path) > len(path):
+                                raise
+                            invalid = e
+                            continue
+                        if out is None and cval is not value:
+                            out = list(itertools.islice(data, i))
+                        if out is not None and cval is not Remove:
+                            out.append(cval)
+                        break
+                    else:
+                        raise invalid
+                finally:
+                    path.pop()
+            if out is None:
+                return data
+            if _isnamedtuple(data):
+                return type(data)(*out)
+            return type(data)(out)
+        return _homogeneous_fast_path(self, schema, seq_type, validate_sequence)
+
+def _overrides_compile(cls: typing.Type[Schema]) -> bool:
+    """Return whether `cls` overrides any of the `_compile` methods of `Schema`."""
+    return any((getattr(cls, name) is not getattr(Schema, name) for name in dir(Schema) if name.startswith('_compile')))
+
+def _standard_scalars(schema: Schema) -> bool:
+    """Return whether `schema` compiles literals and types as `Schema` does.
+
+    Subclasses overriding `_compile` may compile them differently, unless
+    they set `_standard_scalars` to True.
+    """
+    cls = type(schema)
+    return cls._compile is Schema._compile or getattr(cls, '_standard_scalars', False)
+
+def _homogeneous_fast_path(schema, sequence_schema, seq_type, validate_sequence):
+    """Wrap `validate_sequence` with a fast path if `sequence_schema` only lists types.
+
+    Data whose items are all instances of the types is returned as is
+    after a single pass. Anything else goes through `validate_sequence`,
+    which also builds the errors.
+    """
+    if not sequence_schema or not _standard_scalars(schema):
+        return validate_sequence
+    if not all((inspect.isclass(s) and (not hasattr(s, '__voluptuous_compile__')) for s in sequence_schema)):
+        return validate_sequence
+    types = tuple(sequence_schema)
+
+    def validate_homogeneous_sequence(path, data):
+        if isinstance(data, seq_type) and all(map(isinstance, data, itertools.repeat(types))):
+            return data
+        return validate_sequence(path, data)
+    return validate_homogeneous_sequence
+
+def _copy_items(data, count):
+    """Return a copy of the first `count` items of the mapping `data`."""
+    out = data.__class__()
+    for key, value in itertools.islice(data.items(), count):
+        out[key] = value
+    return out
 
 def _compile_scalar(schema):
     """A scalar value.
@@ -377,23 +1135,444 @@ def _compile_scalar(schema):
     >>> with raises(er.Invalid, 'not a valid value'):
     ...   _compile_scalar(lambda v: float(v))([], 'a')
     """
-    pass
+    if inspect.isclass(schema):
+
+        def validate_instance(path, data):
+            if isinstance(data, schema):
+                return data
+            else:
+                msg = 'expected %s' % schema.__name__
+                raise er.TypeInvalid(msg, path)
+        return validate_instance
+    if callable(schema):
+
+        def validate_callable(path, data):
+            try:
+                return schema(data)
+            except ValueError:
+                raise er.ValueInvalid('not a valid value', path)
+            except er.Invalid as e:
+                e.prepend(path)
+                raise
+        return validate_callable
+
+    def validate_value(path, data):
+        if data != schema:
+            raise er.ScalarInvalid('not a valid value', path)
+        return data
+    return validate_value
+
+def _compile_groups(schema):
+    """Create a validator for the `Exclusive` and `Inclusive` groups of a
+    dictionary schema, or return None if it has none."""
+    groups_of_exclusion = {}
+    groups_of_inclusion = {}
+    for node in schema:
+        if isinstance(node, Exclusive):
+            g = groups_of_exclusion.setdefault(node.group_of_exclusion, [])
+            g.append(node)
+        elif isinstance(node, Inclusive):
+            g = groups_of_inclusion.setdefault(node.group_of_inclusion, [])
+            g.append(node)
+    if not groups_of_exclusion and (not groups_of_inclusion):
+        return None
+
+    def validate_groups(path, data):
+        errors = []
+        for label, group in groups_of_exclusion.items():
+            exists = False
+            for exclusive in group:
+                if exclusive.schema in data:
+                    if exists:
+                        msg = exclusive.msg if hasattr(exclusive, 'msg') and exclusive.msg else "two or more values in the same group of exclusion '%s'" % label
+                        next_path = path + [VirtualPathComponent(label)]
+                        errors.append(er.ExclusiveInvalid(msg, next_path))
+                        break
+                    exists = True
+        if errors:
+            raise er.MultipleInvalid(errors)
+        for label, group in groups_of_inclusion.items():
+            included = [node.schema in data for node in group]
+            if any(included) and (not all(included)):
+                msg = "some but not all values in the same group of inclusion '%s'" % label
+                for g in group:
+                    if hasattr(g, 'msg') and g.msg:
+                        msg = g.msg
+                        break
+                next_path = path + [VirtualPathComponent(label)]
+                errors.append(er.InclusiveInvalid(msg, next_path))
+                break
+        if errors:
+            raise er.MultipleInvalid(errors)
+    return validate_groups
 
 def _compile_itemsort():
     """return sort function of mappings"""
-    pass
+
+    def is_extra(key_):
+        return key_ is Extra
+
+    def is_remove(key_):
+        return isinstance(key_, Remove)
+
+    def is_marker(key_):
+        return isinstance(key_, Marker)
+
+    def is_type(key_):
+        return inspect.isclass(key_)
+
+    def is_callable(key_):
+        return callable(key_)
+    priority = [(1, is_remove), (2, is_marker), (4, is_type), (3, is_callable), (5, is_extra)]
+
+    def item_priority(item_):
+        key_ = item_[0]
+        for i, check_ in priority:
+            if check_(key_):
+                return i
+        return 0
+    return item_priority
 _sort_item = _compile_itemsort()
 
 def _iterate_mapping_candidates(schema):
     """Iterate over schema in a meaningful order."""
-    pass
+    return sorted(schema.items(), key=_sort_item)
 
 def _iterate_object(obj):
     """Return iterator over object attributes. Respect objects with
     defined __slots__.
 
     """
-    pass
+    d = {}
+    try:
+        d = vars(obj)
+    except TypeError:
+        if hasattr(obj, '_asdict'):
+            d = obj._asdict()
+    for item in d.items():
+        yield item
+    try:
+        slots = obj.__slots__
+    except AttributeError:
+        pass
+    else:
+        for key in slots:
+            if key != '__dict__':
+                yield (key, getattr(obj, key))
+
+def _fingerprint(schema):
+    """Return a description of the structure of `schema`.
+
+    Schemas with equal fingerprints compile to interchangeable validators.
+    Containers and markers are described recursively, objects providing
+    `__voluptuous_fingerprint__` by what it returns, and anything else by the
+    object itself, so the result is only hashable if those objects are.
+    """
+    type_ = type(schema)
+    if type_ in _FINGERPRINT_LITERAL_TYPES or isinstance(schema, type):
+        return (type_, schema)
+    if type_ is dict or isinstance(schema, collections.abc.Mapping):
+        items = tuple([(_fingerprint(k), _fingerprint(v)) for k, v in schema.items()])
+        if isinstance(schema, Object):
+            return (type_, schema.cls, items)
+        return (type_, items)
+    if type_ in (list, tuple, set, frozenset) or isinstance(schema, (list, tuple, set, frozenset)):
+        return (type_, tuple([_fingerprint(v) for v in schema]))
+    if isinstance(schema, Marker):
+        attrs = tuple([(name, _fingerprint(value)) for name, value in sorted(getattr(schema, '__dict__', {}).items())])
+        return (type_, _fingerprint(schema.schema), schema.msg, schema.description, attrs)
+    if hasattr(schema, '__voluptuous_fingerprint__'):
+        return (type_, _fingerprint(schema.__voluptuous_fingerprint__()))
+    if type_ is partial and schema.func is _default_value:
+        return (type_, 'default', schema.args[0])
+    return (type_, schema)
+_FINGERPRINT_LITERAL_TYPES = frozenset((*primitive_types, type(None)))
+
+class CompileCache(object):
+    """A process-wide LRU cache of compiled schemas.
+
+    Building the same schema over and over, for example inside a request
+    handler, compiles it every time. With the cache enabled, `Schema`
+    construction looks up the compiled validator by the structure of the
+    schema plus `required`, `extra` and `backend`, and only compiles on a
+    miss. Schemas that cannot be fingerprinted are compiled as usual.
+
+    The cache is disabled by default:
+
+    >>> compile_cache.enable(maxsize=128)
+    >>> s1 = Schema({Required('a'): int})
+    >>> s2 = Schema({Required('a'): int})
+    >>> s1._compiled is s2._compiled
+    True
+    >>> compile_cache.disable()
+    """
+
+    def __init__(self, maxsize: int=1024) -> None:
+        self.maxsize = maxsize
+        self.enabled = False
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def enable(self, maxsize: typing.Optional[int]=None) -> None:
+        """Start caching compiled schemas, optionally changing the size bound."""
+        if maxsize is not None:
+            self.maxsize = maxsize
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop caching and drop all entries."""
+        self.enabled = False
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all entries and reset the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self):
+        return 'CompileCache(maxsize=%d, size=%d, hits=%d, misses=%d)' % (self.maxsize, len(self), self.hits, self.misses)
+
+    def compile(self, schema: Schema) -> typing.Callable:
+        """Return the compiled validator for `schema`, compiling on a miss."""
+        key = (type(schema), _fingerprint(schema.schema), schema.required, schema.extra, schema.backend, schema.max_errors)
+        try:
+            hash(key)
+        except TypeError:
+            return schema._compile(schema.schema)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        compiled = schema._compile(schema.schema)
+        with self._lock:
+            self._entries[key] = compiled
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return compiled
+compile_cache = CompileCache()
+_MISSING = object()
+
+class LRU(object):
+    """A bounded, thread-safe least recently used cache with hit statistics.
+
+    Passed as `Schema(..., cache=LRU(n))`, it memoizes the outcome of
+    validating data by the data's structure, so validating an equal payload
+    again returns the remembered output or raises the remembered errors
+    without running any validator:
+
+    >>> cache = LRU(100)
+    >>> validate = Schema({'id': int, 'tags': [str]}, cache=cache)
+    >>> validate({'id': 1, 'tags': ['a']})
+    {'id': 1, 'tags': ['a']}
+    >>> validate({'id': 1, 'tags': ['a']})
+    {'id': 1, 'tags': ['a']}
+    >>> cache
+    LRU(maxsize=100, size=1, hits=1, misses=1, evictions=0)
+
+    Only dicts, lists, tuples, sets and scalars of the built-in types are
+    looked up. Any other data is validated without the cache.
+
+    Lookups do not take the lock, so when threads share a cache the
+    counters may miss a few updates.
+    """
+
+    def __init__(self, maxsize: int=1024) -> None:
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        return (type(self), (self.maxsize,))
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that were hits, 0.0 before any lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: typing.Hashable, default: typing.Any=None) -> typing.Any:
+        """Return the value stored for `key`, or `default`, counting a hit or a miss."""
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key: typing.Hashable, value: typing.Any) -> None:
+        """Store `value` for `key`, evicting the least recently used entries over `maxsize`."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self):
+        return 'LRU(maxsize=%d, size=%d, hits=%d, misses=%d, evictions=%d)' % (self.maxsize, len(self), self.hits, self.misses, self.evictions)
+
+def pure(validator: typing.Callable) -> typing.Callable:
+    """Declare that `validator` is pure, and return it.
+
+    A pure validator returns equal outputs for equal inputs, or raises
+    equal errors, and has no side effects. Schemas built only from pure
+    validators, literals and types can use `Schema(..., cache=...)`:
+
+    >>> @pure
+    ... def even(v):
+    ...   if v % 2:
+    ...     raise er.Invalid('not even')
+    ...   return v
+    >>> validate = Schema([even], cache=LRU(10))
+
+    Classes can set ``__voluptuous_pure__ = True`` instead, or define a
+    ``__voluptuous_pure__()`` method deciding from their arguments.
+    """
+    setattr(validator, '__voluptuous_pure__', True)
+    return validator
+
+def _pure_default(default) -> bool:
+    return default is UNDEFINED or isinstance(default, type) or (type(default) is partial and default.func is _default_value)
+
+def is_pure(schema: Schemable) -> bool:
+    """Return whether every validator in `schema` is declared pure, see :func:`pure`.
+
+    >>> is_pure({'a': [int], Optional('b', default=1): str})
+    True
+    >>> is_pure({'a': lambda v: v})
+    False
+    """
+    if schema is Self or schema is Extra or type(schema) in _FINGERPRINT_LITERAL_TYPES or isinstance(schema, type):
+        return True
+    if isinstance(schema, Schema):
+        return is_pure(schema.schema)
+    if isinstance(schema, collections.abc.Mapping):
+        return all((is_pure(k) and is_pure(v) for k, v in schema.items()))
+    if isinstance(schema, (list, tuple, set, frozenset)):
+        return all((is_pure(v) for v in schema))
+    if isinstance(schema, Marker):
+        return is_pure(schema.schema) and _pure_default(getattr(schema, 'default', UNDEFINED))
+    declared = getattr(schema, '__voluptuous_pure__', False)
+    return bool(declared() if callable(declared) else declared)
+_FROZEN_SCALAR_TYPES = frozenset((bool, bytes, int, str, type(None)))
+
+def _freeze(data):
+    """Return a hashable description of `data`, equal only for data that validates the same.
+
+    Raises TypeError for data that cannot be described.
+    """
+    type_ = type(data)
+    if type_ in _FROZEN_SCALAR_TYPES:
+        return (type_, data)
+    if type_ is float:
+        return (type_, data.hex())
+    if type_ is dict:
+        return (type_, tuple([(_freeze(k), _freeze(v)) for k, v in data.items()]))
+    if type_ is list or type_ is tuple or _isnamedtuple(data):
+        return (type_, tuple([_freeze(v) for v in data]))
+    if type_ is set or type_ is frozenset:
+        return (type_, frozenset([_freeze(v) for v in data]))
+    raise TypeError('cannot freeze %s' % type_.__name__)
+_UNCHANGED = object()
+
+def _copy_output(value):
+    """Copy the containers in the validation output `value`, which may be shared."""
+    type_ = type(value)
+    if type_ in _FROZEN_SCALAR_TYPES or type_ is float:
+        return value
+    if type_ is dict:
+        return {k: _copy_output(v) for k, v in value.items()}
+    if type_ is list:
+        return [_copy_output(v) for v in value]
+    return copy.deepcopy(value)
+
+def _cache_key(token: typing.Hashable, data) -> typing.Optional[tuple]:
+    """Return the cache key of `data` for the validator identified by `token`, or None."""
+    type_ = type(data)
+    if type_ in _FROZEN_SCALAR_TYPES:
+        return (token, type_, data)
+    try:
+        return (token, _freeze(data))
+    except TypeError:
+        return None
+
+def _remember(cache: LRU, key: tuple, data, output) -> None:
+    cache.put(key, (_UNCHANGED if output is data else _copy_output(output), None))
+
+def _remember_error(cache: LRU, key: tuple, error: er.Invalid, path: typing.List[typing.Hashable]) -> None:
+    """Store `error` relative to the validated value, then move it to `path`."""
+    cache.put(key, (None, copy.copy(error)))
+    if path:
+        error.prepend(list(path))
+
+def _replay(entry: tuple, path: typing.List[typing.Hashable], data):
+    """Return the remembered output of `entry` for `data`, or raise its error at `path`."""
+    output, error = entry
+    if error is not None:
+        error = copy.copy(error)
+        if path:
+            error.prepend(list(path))
+        raise error
+    if output is _UNCHANGED:
+        return data
+    if type(output) in _FROZEN_SCALAR_TYPES:
+        return output
+    return _copy_output(output)
+
+def _cached_validator(cache: LRU, validate: typing.Callable, token: typing.Hashable) -> typing.Callable:
+    """Memoize the outcomes of the compiled validator `validate` in `cache`.
+
+    Entries are keyed by `token` and the structure of the data. Errors are
+    remembered with paths relative to the validated value, and outputs are
+    copied in and out of the cache so that callers can modify them, except
+    when the output was the input itself.
+    """
+
+    def validate_cached(path, data):
+        key = _cache_key(token, data)
+        if key is None:
+            return validate(path, data)
+        entry = cache.get(key, _MISSING)
+        if entry is not _MISSING:
+            return _replay(entry, path, data)
+        try:
+            output = validate([], data)
+        except er.Invalid as e:
+            _remember_error(cache, key, e, path)
+            raise
+        _remember(cache, key, data, output)
+        return output
+    return validate_cached
 
 class Msg(object):
     """Report a user-friendly message if a schema fails to validate.
@@ -441,6 +1620,12 @@ class Msg(object):
             else:
                 raise (self.cls or er.Invalid)(self.msg)
 
+    def __voluptuous_fingerprint__(self):
+        return (self._schema, self.msg, self.cls)
+
+    def __voluptuous_pure__(self):
+        return is_pure(self._schema)
+
     def __repr__(self):
         return 'Msg(%s, %s, cls=%s)' % (self._schema, self.msg, self.cls)
 
@@ -465,14 +1650,22 @@ class Marker(object):
     `description` is an optional field, unused by Voluptuous itself, but can be
     introspected by any external tool, for example to generate schema documentation.
     """
-    __slots__ = ('schema', '_schema', 'msg', 'description', '__hash__')
+    __slots__ = ('schema', '_schema', 'msg', 'description')
 
     def __init__(self, schema_: Schemable, msg: typing.Optional[str]=None, description: typing.Any | None=None) -> None:
         self.schema: typing.Any = schema_
         self._schema = Schema(schema_)
         self.msg = msg
         self.description = description
-        self.__hash__ = cache(lambda: hash(schema_))
+
+    def __getstate__(self):
+        return (self.schema, self.msg, self.description, getattr(self, '__dict__', None))
+
+    def __setstate__(self, state):
+        schema_, msg, description, attrs = state
+        Marker.__init__(self, schema_, msg, description)
+        if attrs:
+            self.__dict__.update(attrs)
 
     def __call__(self, v):
         try:
@@ -499,6 +1692,9 @@ class Marker(object):
     def __ne__(self, other):
         return not self.schema == other
 
+    def __hash__(self):
+        return hash(self.schema)
+
 class Optional(Marker):
     """Mark a node in the schema as optional, and optionally provide a default
 
@@ -646,9 +1842,8 @@ class Remove(Marker):
     [1, 2, 3, 5, '7']
     """
 
-    def __init__(self, schema_: Schemable, msg: typing.Optional[str]=None, description: typing.Any | None=None) -> None:
-        super().__init__(schema_, msg, description)
-        self.__hash__ = cache(lambda: object.__hash__(self))
+    def __hash__(self):
+        return object.__hash__(self)
 
     def __call__(self, schema: Schemable):
         super(Remove, self).__call__(schema)
@@ -685,15 +1880,41 @@ def message(default: typing.Optional[str]=None, cls: typing.Optional[typing.Type
         ... except er.MultipleInvalid as e:
         ...   assert isinstance(e.errors[0], IntegerInvalid)
     """
-    pass
+    if cls and (not issubclass(cls, er.Invalid)):
+        raise er.SchemaError('message can only use subclases of Invalid as custom class')
+
+    def decorator(f):
+
+        @wraps(f)
+        def check(msg=None, clsoverride=None):
+
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                try:
+                    return f(*args, **kwargs)
+                except ValueError:
+                    raise (clsoverride or cls or er.ValueInvalid)(msg or default or 'invalid value')
+            return wrapper
+        return check
+    return decorator
 
 def _args_to_dict(func, args):
     """Returns argument names as values as key-value pairs."""
-    pass
+    if sys.version_info >= (3, 0):
+        arg_count = func.__code__.co_argcount
+        arg_names = func.__code__.co_varnames[:arg_count]
+    else:
+        arg_count = func.func_code.co_argcount
+        arg_names = func.func_code.co_varnames[:arg_count]
+    arg_value_list = list(args)
+    arguments = dict(((arg_name, arg_value_list[i]) for i, arg_name in enumerate(arg_names) if i < len(arg_value_list)))
+    return arguments
 
 def _merge_args_with_kwargs(args_dict, kwargs_dict):
     """Merge args with kwargs."""
-    pass
+    ret = args_dict.copy()
+    ret.update(kwargs_dict)
+    return ret
 
 def validate(*a, **kw) -> typing.Callable:
     """Decorator for validating arguments of a function against a given schema.
@@ -711,4 +1932,26 @@ def validate(*a, **kw) -> typing.Callable:
         ...   return arg1 * 2
 
     """
-    pass
+    RETURNS_KEY = '__return__'
+
+    def validate_schema_decorator(func):
+        returns_defined = False
+        returns = None
+        schema_args_dict = _args_to_dict(func, a)
+        schema_arguments = _merge_args_with_kwargs(schema_args_dict, kw)
+        if RETURNS_KEY in schema_arguments:
+            returns_defined = True
+            returns = schema_arguments[RETURNS_KEY]
+            del schema_arguments[RETURNS_KEY]
+        input_schema = Schema(schema_arguments, extra=ALLOW_EXTRA) if len(schema_arguments) != 0 else lambda x: x
+        output_schema = Schema(returns) if returns_defined else lambda x: x
+
+        @wraps(func)
+        def func_wrapper(*args, **kwargs):
+            args_dict = _args_to_dict(func, args)
+            arguments = _merge_args_with_kwargs(args_dict, kwargs)
+            validated_arguments = input_schema(arguments)
+            output = func(**validated_arguments)
+            return output_schema(output)
+        return func_wrapper
+    return validate_schema_decorator
@@ -1,20 +1,27 @@
 # fmt: off
+import asyncio
 import collections
 import copy
 import os
+import pickle
 import sys
+import threading
+import time
 from enum import Enum
 
 import pytest
 
 from voluptuous import (
-    ALLOW_EXTRA, PREVENT_EXTRA, All, AllInvalid, Any, Clamp, Coerce, Contains,
-    ContainsInvalid, Date, Datetime, Email, EmailInvalid, Equal, ExactSequence,
+    ALLOW_EXTRA, PREVENT_EXTRA, All, AllInvalid, Any, AsyncSchema, CheckSchema, Clamp, Coerce,
+    Contains, ContainsInvalid, Date, Datetime, Email, EmailInvalid, Equal, ExactSequence,
+    ExclusiveInvalid, InclusiveInvalid,
     Exclusive, Extra, FqdnUrl, In, Inclusive, InInvalid, Invalid, IsDir, IsFile, Length,
-    Literal, LiteralInvalid, Marker, Match, MatchInvalid, Maybe, MultipleInvalid, NotIn,
+    LRU, Literal, LiteralInvalid, Marker, Match, MatchInvalid, Maybe, Memoize, Msg,
+    MultipleInvalid, NotIn,
     NotInInvalid, Number, Object, Optional, PathExists, Range, Remove, Replace,
-    Required, Schema, Self, SomeOf, TooManyValid, TypeInvalid, Union, Unordered, Url,
-    UrlInvalid, raises, validate,
+    REMOVE_EXTRA, Required, Schema, SchemaError, Self, SomeOf, TooManyValid,
+    TypeInvalid, Union, Unique, Unordered, Url, UrlInvalid, compile_cache, is_pure, pure, raises,
+    validate,
 )
 from voluptuous.humanize import humanize_error
 from voluptuous.util import Capitalize, Lower, Strip, Title, Upper
@@ -1773,3 +1780,1166 @@ def test_exception():
     assert str(ctx.value.errors) == f"[{invalid_scalar_excp_repr}]"
     ctx.value.add("Test Error")
     assert str(ctx.value.errors) == f"[{invalid_scalar_excp_repr}, 'Test Error']"
+
+
+def _errors_of(schema, data):
+    try:
+        return schema(data), None
+    except MultipleInvalid as e:
+        return None, sorted(str(err) for err in e.errors)
+
+
+@pytest.mark.parametrize(
+    "schema, required, extra, data",
+    [
+        ({'a': int, 'b': str}, False, PREVENT_EXTRA, {'a': 1, 'b': 'x'}),
+        ({'a': int, 'b': str}, False, PREVENT_EXTRA, {'a': 'x', 'c': 1}),
+        ({'a': int, 'b': str}, True, PREVENT_EXTRA, {}),
+        ({'a': int}, False, ALLOW_EXTRA, {'a': 1, 'z': 2}),
+        ({'a': int}, False, REMOVE_EXTRA, {'a': 1, 'z': 2}),
+        ({Required('a', 'need a'): 1, Optional('b', default=2): 2}, False, 0, {}),
+        ({Required('a'): {'b': {'c': [int]}}}, False, 0, {'a': {'b': {'c': ['x']}}}),
+        ({'v': Any(int, None), 'w': None, 's': Self}, False, 0, {'v': 'x', 'w': 1}),
+        ({k: int for k in range(40)}, False, 0, {k: k for k in range(0, 40, 3)}),
+        ({k: int for k in range(40)}, False, 0, {k: str(k) for k in range(40)}),
+        ({str: int, 'a': str}, False, PREVENT_EXTRA, {'a': 'x', 'b': 2, 1: 1}),
+    ],
+)
+def test_codegen_backend_matches_closure(schema, required, extra, data):
+    closure = Schema(schema, required=required, extra=extra)
+    codegen = Schema(schema, required=required, extra=extra, backend='codegen')
+    assert _errors_of(codegen, data) == _errors_of(closure, data)
+
+
+def test_codegen_backend_generates_source():
+    schema = Schema({'a': int, Optional('b'): {'c': str}}, backend='codegen')
+    assert 'isinstance(value, type_' in schema._compiled.__source__
+    assert schema.extend({'d': int}).backend == 'codegen'
+
+
+def test_codegen_backend_unsupported_keys_fall_back():
+    schema = Schema(
+        {Exclusive('a', 'g'): int, Exclusive('b', 'g'): int}, backend='codegen'
+    )
+    assert not hasattr(schema._compiled, '__source__')
+    with raises(MultipleInvalid, "two or more values in the same group of exclusion 'g' @ data[<g>]"):
+        schema({'a': 1, 'b': 2})
+
+
+def test_unknown_backend():
+    with pytest.raises(SchemaError):
+        Schema({}, backend='jit')
+
+
+def test_type_keys_dispatch_by_key_type():
+    schema = Schema({int: str, str: int})
+    assert schema({'a': 1, 2: 'b'}) == {'a': 1, 2: 'b'}
+    with raises(MultipleInvalid, "expected int @ data[1.5]"):
+        schema({1.5: 'x'})
+    with raises(MultipleInvalid, "expected string or buffer @ data[None]"):
+        Schema({Match('^x'): bool, str: int})({None: 1})
+
+
+@pytest.fixture
+def enabled_compile_cache():
+    compile_cache.enable(maxsize=4)
+    try:
+        yield compile_cache
+    finally:
+        compile_cache.disable()
+        compile_cache.maxsize = 1024
+
+
+def test_compile_cache_hits_structurally_equal_schemas(enabled_compile_cache):
+    def build():
+        return Schema({Required('a'): All(int, Range(min=1)), Optional('b', default=2): int})
+
+    first = build()
+    hits, misses = enabled_compile_cache.hits, enabled_compile_cache.misses
+    second = build()
+    assert second._compiled is first._compiled
+    assert enabled_compile_cache.hits > hits
+    assert enabled_compile_cache.misses == misses
+    assert second({'a': 1}) == {'a': 1, 'b': 2}
+    assert Schema({'a': int}, required=True)._compiled is not Schema({'a': int})._compiled
+
+
+def test_compile_cache_is_bounded_and_clearable(enabled_compile_cache):
+    for i in range(10):
+        Schema({'key%d' % i: int})
+    assert len(enabled_compile_cache) == 4
+    enabled_compile_cache.clear()
+    assert len(enabled_compile_cache) == 0
+    assert enabled_compile_cache.hits == enabled_compile_cache.misses == 0
+
+
+def test_compile_cache_skips_unhashable_schemas(enabled_compile_cache):
+    key = Optional('a', default=[])
+    size = len(enabled_compile_cache)
+    schema = Schema({key: list})
+    assert len(enabled_compile_cache) == size
+    assert schema({}) == {'a': []}
+
+
+def test_compile_cache_keeps_instance_state_apart(enabled_compile_cache):
+    def build(**kwargs):
+        return Schema(Any({'a': int}, {'a': str}, **kwargs))
+
+    assert build()._compiled is build()._compiled
+    assert build(plan={'order': [1, 0]})._compiled is not build()._compiled
+
+    lru = LRU(4)
+    Schema({'a': Schema(int, cache=lru)})({'a': 1})
+    Schema({'a': Schema(int)})({'a': 2})
+    assert lru.misses == 1
+
+
+def test_lazy_schema_compiles_on_first_call():
+    schema = Schema({'a': int}, lazy=True)
+    assert schema._compiled == schema._compile_on_first_call
+    assert schema({'a': 1}) == {'a': 1}
+    assert schema._compiled != schema._compile_on_first_call
+    assert schema.extend({'b': int}).lazy
+
+    broken = Schema(bytearray(b'x'), lazy=True)
+    with pytest.raises(SchemaError):
+        broken(1)
+
+
+def test_lazy_schema_default(monkeypatch):
+    monkeypatch.setattr(Schema, 'default_lazy', True)
+    assert Schema(int).lazy
+    assert not Schema(int, lazy=False).lazy
+
+
+def test_lazy_schema_compiles_once_across_threads():
+    compiled = []
+
+    class Counting(object):
+        def __voluptuous_compile__(self, schema):
+            compiled.append(schema)
+            time.sleep(0.01)
+            return lambda path, value: value
+
+    schema = Schema(Counting(), lazy=True)
+    threads = [threading.Thread(target=schema, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(compiled) == 1
+
+
+def test_is_valid():
+    schema = Schema({Required('a'): [int], 'b': Any(str, None)})
+    assert schema.is_valid({'a': [1, 2], 'b': 'x'})
+    assert not schema.is_valid({'a': [1, 'x']})
+    assert not schema.is_valid({'b': 'x'})
+    assert not schema.is_valid({'a': [], 'c': 1})
+    assert not schema.is_valid([])
+    assert isinstance(schema._checker, CheckSchema)
+
+
+def test_is_valid_uses_subclass_compilation():
+    class Anything(Schema):
+        def _compile(self, schema):
+            if schema == 'anything':
+                return lambda path, value: value
+            return super()._compile(schema)
+
+    schema = Anything({'a': 'anything'})
+    assert schema({'a': 5}) == {'a': 5}
+    assert schema.is_valid({'a': 5})
+    assert not schema.is_valid({'b': 5})
+
+
+def test_check_schema_returns_unchanged_data():
+    schema = CheckSchema({'a': [int], 'b': {'c': str}}, extra=ALLOW_EXTRA)
+    data = {'a': [1, 2], 'b': {'c': 'x'}, 'd': 1}
+    assert schema(data) is data
+
+
+def test_check_schema_copies_on_write():
+    schema = CheckSchema({'a': [Coerce(int)], 'b': int, Optional('c', default=3): int, Remove('d'): int})
+    data = {'a': [1, '2'], 'b': 1}
+    result = schema(data)
+    assert result == {'a': [1, 2], 'b': 1, 'c': 3}
+    assert data == {'a': [1, '2'], 'b': 1}
+    assert schema({'a': [1], 'b': 1, 'c': 3, 'd': 4}) == {'a': [1], 'b': 1, 'c': 3}
+
+
+def test_check_schema_raises_first_error():
+    schema = CheckSchema({'a': int, 'b': int})
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema({'a': 'x', 'b': 'y'})
+    assert len(ctx.value.errors) == 1
+    assert CheckSchema({'a': int}, extra=REMOVE_EXTRA)({'a': 1, 'b': 2}) == {'a': 1}
+
+
+@pytest.mark.parametrize('backend', ['closure', 'codegen'])
+def test_unchanged_containers_are_returned_as_is(backend):
+    schema = Schema({'a': [int], 'b': (str,), 'c': {int}, 'd': {'e': int}}, backend=backend)
+    data = {'a': [1, 2], 'b': ('x',), 'c': {1}, 'd': {'e': 1}}
+    result = schema(data)
+    assert result is data
+    assert Schema({'a': list}, extra=ALLOW_EXTRA, backend=backend)(data) is data
+
+
+@pytest.mark.parametrize('backend', ['closure', 'codegen'])
+def test_changed_containers_are_copied(backend):
+    data = {'a': [1, '2', 3], 'b': 1, 'c': 2}
+    for schema, expected in [
+        ({'a': [Coerce(int)], 'b': int, 'c': int}, {'a': [1, 2, 3], 'b': 1, 'c': 2}),
+        ({'a': list, 'b': int, 'c': int, Optional('d', default=4): int}, dict(data, d=4)),
+        ({'a': list, Remove('b'): int, 'c': int}, {'a': [1, '2', 3], 'c': 2}),
+        ({'a': [Remove(str), int], 'b': int, 'c': int}, {'a': [1, 3], 'b': 1, 'c': 2}),
+    ]:
+        result = Schema(schema, backend=backend)(data)
+        assert result == expected
+        assert result is not data
+    assert data == {'a': [1, '2', 3], 'b': 1, 'c': 2}
+    result = Schema({'a': list}, extra=REMOVE_EXTRA, backend=backend)(data)
+    assert result == {'a': [1, '2', 3]}
+    assert result['a'] is data['a']
+
+
+@pytest.mark.parametrize('backend', ['closure', 'codegen'])
+def test_max_errors_stops_collecting(backend):
+    schema = Schema({'a': int, 'b': int, 'c': int, 'd': [int]}, max_errors=2, backend=backend)
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema({'a': 'x', 'b': 'x', 'c': 'x', 'd': ['x']})
+    assert [e.path for e in ctx.value.errors] == [['a'], ['b']]
+
+    seen = []
+
+    def record(value):
+        seen.append(value)
+        raise Invalid('bad')
+
+    schema = Schema({'items': [record]}, max_errors=3, backend=backend)
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema({'items': list(range(100))})
+    assert len(ctx.value.errors) == 3
+    assert seen == [0, 1, 2]
+
+
+def test_fail_fast():
+    schema = Schema({'a': Any({'b': int, 'c': int}, None), 'd': {int}}, fail_fast=True)
+    assert schema.max_errors == 1
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema({'a': {'b': 'x', 'c': 'x'}, 'd': {'x'}})
+    assert len(ctx.value.errors) == 1
+    assert schema.extend({'e': int}).max_errors == 1
+    assert Schema([int], fail_fast=True)([1, 2]) == [1, 2]
+    with pytest.raises(SchemaError):
+        Schema(int, max_errors=0)
+
+
+def test_error_paths_are_copied_from_path_stack():
+    schema = Schema({'a': [{'b': int}], 'c': Any({'d': int}, [int])})
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema({'a': [{'b': 1}, {'b': 'x'}], 'c': {'d': 'y'}})
+    assert sorted(e.path for e in ctx.value.errors) == [['a', 1, 'b'], ['c', 'd']]
+
+    path = ['root']
+    with pytest.raises(MultipleInvalid):
+        schema._compiled(path, {'a': [{'b': 'x'}]})
+    assert path == ['root']
+
+    error = Invalid('bad', path)
+    path.append('x')
+    assert error.path == ['root']
+
+
+def test_error_messages_are_formatted_lazily():
+    iterations = []
+
+    class Container(object):
+        def __contains__(self, item):
+            return False
+
+        def __iter__(self):
+            iterations.append(1)
+            return iter(['b', 'a'])
+
+    schema = Schema(Any(In(Container()), int))
+    assert schema(1) == 1
+    assert iterations == []
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema('x')
+    assert str(ctx.value) == "value must be one of ['a', 'b']"
+    assert repr(ctx.value.errors[0]) == "InInvalid(\"value must be one of ['a', 'b']\")"
+    assert iterations == [1]
+
+    error = Invalid(lambda: 'deferred', ['a'])
+    assert error.error_message == 'deferred'
+    assert str(error) == "deferred @ data['a']"
+
+
+ANY_ALTERNATIVES = [
+    'a', 1, None, True, 2.5, b'b', float('nan'), int, str, bool, {'x': int}, [str], (int,), {1},
+    Range(min=10), Coerce(int), lambda v: v, collections.OrderedDict, Object({'y': int}),
+]
+ANY_VALUES = ['a', 'b', 1, 1.0, 0, True, False, 2.5, None, b'b', float('nan'), 12, '12', {'x': 1}, {'x': 'y'},
+              collections.OrderedDict(x=1), ['s'], [1], (1,), ('s',), {1}, {2}, frozenset([1]), 3j]
+
+
+@pytest.mark.parametrize('count', range(1, len(ANY_ALTERNATIVES) + 1, 3))
+def test_any_dispatch_matches_ordered_trial(count):
+    for start in range(len(ANY_ALTERNATIVES)):
+        alternatives = (ANY_ALTERNATIVES[start:] + ANY_ALTERNATIVES[:start])[:count]
+        dispatched = Schema(Any(*alternatives))
+        ordered = Schema(Any(*alternatives, discriminant=lambda value, validators: validators))
+        for value in ANY_VALUES:
+            try:
+                expected = ordered(value)
+            except MultipleInvalid as e:
+                with pytest.raises(MultipleInvalid) as ctx:
+                    dispatched(value)
+                assert str(ctx.value) == str(e)
+                assert type(ctx.value.errors[0]) is type(e.errors[0])
+            else:
+                result = dispatched(value)
+                assert type(result) is type(expected)
+                assert result is expected or result == expected
+
+
+def test_any_dispatch_skips_alternatives_by_type():
+    calls = []
+
+    def record(value):
+        calls.append(value)
+        return value
+
+    schema = Schema(Any(*['v%d' % i for i in range(30)], {'a': int}, int, record))
+    assert schema('v29') == 'v29'
+    assert schema(3) == 3
+    assert schema({'a': 1}) == {'a': 1}
+    assert calls == []
+    assert schema(1.5) == 1.5
+    assert calls == [1.5]
+
+
+def test_union_tag_dispatch():
+    schema = Schema(
+        {
+            'event': Union(
+                {Required('type'): 'created', 'id': int},
+                {'type': 'renamed', 'id': int, 'name': str},
+                {'type': 'renamed', 'id': int, 'names': [str]},
+                tag='type',
+            )
+        }
+    )
+    assert schema({'event': {'type': 'created', 'id': 1}}) == {'event': {'type': 'created', 'id': 1}}
+    assert schema({'event': {'type': 'renamed', 'id': 1, 'names': ['a']}}) == {
+        'event': {'type': 'renamed', 'id': 1, 'names': ['a']}
+    }
+    for data, message in [
+        ({'type': 'created', 'id': 'x'}, "expected int for dictionary value @ data['event']['id']"),
+        ({'type': 'deleted'}, "value must be one of ['created', 'renamed'] @ data['event']['type']"),
+        ({'type': ['created']}, "value must be one of ['created', 'renamed'] @ data['event']['type']"),
+        ({'id': 1}, "required key not provided @ data['event']['type']"),
+        ('created', "expected a dictionary for dictionary value @ data['event']"),
+    ]:
+        with pytest.raises(MultipleInvalid) as ctx:
+            schema({'event': data})
+        assert str(ctx.value) == message
+
+    assert Union({'type': 1}, {'type': 2, 'x': int}, tag='type')({'type': 2, 'x': 3}) == {'type': 2, 'x': 3}
+    with pytest.raises(SchemaError):
+        Schema(Union({'type': 'a'}, {'type': str}, tag='type'))
+    with pytest.raises(SchemaError):
+        Union({'type': 'a'}, tag='type', discriminant=lambda value, validators: validators)
+
+
+def test_any_adaptive_reordering(monkeypatch):
+    monkeypatch.setattr(Any, 'adapt_interval', 10)
+    calls = []
+
+    def record(value):
+        calls.append(value)
+        raise Invalid('never')
+
+    validator = Any({'kind': 'a'}, {'kind': 'b'}, record, {'kind': 'c'}, {'kind': 'd'}, adaptive=True)
+    schema = Schema(validator)
+    for _ in range(10):
+        assert schema({'kind': 'd'}) == {'kind': 'd'}
+    assert validator.export_plan()['order'][0] == 4
+    calls.clear()
+    for _ in range(10):
+        schema({'kind': 'b'})
+    assert calls == []
+    schema({'kind': 'c'})
+    assert len(calls) == 1
+
+    plan = validator.export_plan()
+    restored = Any({'kind': 'a'}, {'kind': 'b'}, record, {'kind': 'c'}, {'kind': 'd'}, adaptive=True, plan=plan)
+    assert restored.export_plan() == plan
+    with pytest.raises(SchemaError):
+        restored.load_plan({'order': [0, 1]})
+
+
+def test_any_is_not_adaptive_by_default():
+    validator = Any(Coerce(int), int, str)
+    schema = Schema(validator)
+    for _ in range(Any.adapt_interval + 1):
+        schema('1')
+    assert validator.export_plan()['order'] == [0, 1, 2]
+    assert schema('1') == 1
+
+
+def test_in_uses_frozenset_membership():
+    codes = ['c%d' % i for i in range(1000)]
+    validator = In(codes)
+    assert isinstance(validator._members, frozenset)
+    assert validator('c999') == 'c999'
+    assert In([[1], [2]])([2]) == [2]
+    with pytest.raises(InInvalid):
+        In(['a'])(['a'])
+    assert NotIn(codes)('x') == 'x'
+    with pytest.raises(NotInInvalid):
+        NotIn(codes)('c5')
+
+
+def test_in_message_is_truncated():
+    with pytest.raises(InInvalid) as ctx:
+        In(['c%03d' % i for i in range(100)])('x')
+    assert str(ctx.value) == 'value must be one of %s, ... 80 more]' % str(['c%03d' % i for i in range(20)])[:-1]
+
+
+def test_in_and_not_in_validate_batch():
+    validator = In(['a', 'b', 'c'])
+    values = ['a', 'b', 'a']
+    assert validator.validate_batch(values) is values
+    with pytest.raises(MultipleInvalid) as ctx:
+        validator.validate_batch(['a', 'x', 'b', 'y'])
+    assert [e.path for e in ctx.value.errors] == [[1], [3]]
+    with pytest.raises(MultipleInvalid) as ctx:
+        validator.validate_batch(['a', ['b']])
+    assert [e.path for e in ctx.value.errors] == [[1]]
+    with pytest.raises(MultipleInvalid) as ctx:
+        NotIn(['a', 'b']).validate_batch(['c', 'b'])
+    assert [e.path for e in ctx.value.errors] == [[1]]
+    assert NotIn('ab').validate_batch(['c']) == ['c']
+
+
+def test_homogeneous_sequence_fast_path():
+    data = list(range(100)) + [True]
+    assert Schema([int])(data) is data
+    mixed = [1, 2.5, 3]
+    assert Schema([int, float])(mixed) is mixed
+    with pytest.raises(MultipleInvalid) as ctx:
+        Schema([int])(list(range(100)) + ['x'])
+    assert [e.path for e in ctx.value.errors] == [[100]]
+    assert str(ctx.value) == "expected int @ data[100]"
+    with pytest.raises(MultipleInvalid) as ctx:
+        Schema([str])('abc')
+    assert str(ctx.value) == "expected a list"
+    point = collections.namedtuple('point', 'x y')(1, 2)
+    assert Schema((int,))(point) is point
+    assert CheckSchema([str]).is_valid(['a', 'b'])
+    assert not CheckSchema([str]).is_valid(['a', 1])
+
+
+def test_validate_many():
+    schema = Schema({"a": int, Required("b"): str})
+    results = schema.validate_many(iter([{"a": 1, "b": "x"}, {"a": "y"}, {"b": "z"}]))
+    assert results.outputs == {0: {"a": 1, "b": "x"}, 2: {"b": "z"}}
+    assert list(results.errors) == [1]
+    assert isinstance(results.errors[1], MultipleInvalid)
+    assert sorted(str(e) for e in results.errors[1].errors) == [
+        "expected int for dictionary value @ data['a']",
+        "required key not provided @ data['b']",
+    ]
+    assert results.valid() == [{"a": 1, "b": "x"}, {"b": "z"}]
+    assert len(results) == 3 and not results
+    assert repr(results) == "<ValidationResults(valid=2, invalid=1)>"
+    assert Schema(int, lazy=True).validate_many([1, 2])
+
+
+def test_validate_many_wraps_single_errors():
+    results = Schema(Range(max=1)).validate_many([0, 5])
+    assert results.outputs == {0: 0}
+    assert [e.path for e in results.errors[1].errors] == [[]]
+
+
+def test_iter_validate_is_lazy():
+    pulled = []
+
+    def records():
+        for i in range(1000000):
+            pulled.append(i)
+            yield i if i % 3 else str(i)
+
+    results = Schema(int).iter_validate(records(), max_failures=2)
+    index, error = next(results)
+    assert index == 0 and isinstance(error, MultipleInvalid)
+    assert pulled == [0]
+    assert list(results)[:2] == [(1, 1), (2, 2)]
+    assert pulled == [0, 1, 2, 3]
+
+
+def test_iter_validate():
+    outcomes = list(Schema({"a": int}).iter_validate([{"a": 1}, {"a": "x"}, {"b": 1}]))
+    assert outcomes[0] == (0, {"a": 1})
+    assert [index for index, _ in outcomes] == [0, 1, 2]
+    assert str(outcomes[1][1]) == "expected int for dictionary value @ data['a']"
+    assert str(outcomes[2][1]) == "extra keys not allowed @ data['b']"
+    with pytest.raises(ValueError):
+        list(Schema(int).iter_validate([1], max_failures=0))
+
+
+def test_schema_pickles():
+    schema = Schema(
+        {
+            Required("a"): All(int, Range(min=0)),
+            Optional("b", default="x"): Any("x", "y", adaptive=True),
+            Exclusive("c", "g"): [Match(r"^\d+$")],
+            Remove("d"): object,
+            Optional("e"): Self,
+        }
+    )
+    schema({"a": 1})
+    restored = pickle.loads(pickle.dumps(schema))
+    assert restored({"a": 1, "d": 2, "e": {"a": 2}}) == {"a": 1, "b": "x", "e": {"a": 2, "b": "x"}}
+    with pytest.raises(MultipleInvalid) as ctx:
+        restored({"a": -1, "c": ["x"]})
+    assert sorted(str(e) for e in ctx.value.errors) == [
+        "does not match regular expression ^\\d+$ @ data['c'][0]",
+        "value must be at least 0 for dictionary value @ data['a']",
+    ]
+    error = pickle.loads(pickle.dumps(ctx.value))
+    assert [e.path for e in error.errors] == [e.path for e in ctx.value.errors]
+
+
+def test_validate_parallel():
+    schema = Schema({Required("id"): int, Optional("tags", default=[]): [str]})
+    records = ({"id": i} if i % 5 else {"id": str(i)} for i in range(250))
+    outcomes = list(schema.validate_parallel(records, workers=2, chunksize=20))
+    assert [index for index, _ in outcomes] == list(range(250))
+    assert outcomes[1] == (1, {"id": 1, "tags": []})
+    assert isinstance(outcomes[5][1], MultipleInvalid)
+    assert str(outcomes[5][1]) == "expected int for dictionary value @ data['id']"
+    assert list(schema.validate_parallel([])) == []
+    with pytest.raises(ValueError):
+        list(schema.validate_parallel([], chunksize=0))
+
+
+class CodedInvalid(Invalid):
+    def __init__(self, code):
+        super().__init__("bad code %d" % code, error_type="code")
+        self.code = code
+
+
+def test_errors_pickle():
+    errors = [
+        TypeInvalid("expected int", ["a", 0], error_type="dictionary value"),
+        Invalid(lambda: "lazy", ["b"], error_message="detail"),
+        CodedInvalid(7),
+        MultipleInvalid([InInvalid("nested", ["c"])]),
+    ]
+    restored = pickle.loads(pickle.dumps(MultipleInvalid(errors)))
+    assert [type(e) for e in restored.errors] == [type(e) for e in errors]
+    assert [str(e) for e in restored.errors] == [str(e) for e in errors]
+    assert [e.path for e in restored.errors] == [e.path for e in errors]
+    assert restored.errors[1].error_message == "detail"
+    assert restored.errors[2].code == 7
+    assert restored.errors[3].errors[0].path == ["c"]
+
+
+def test_errors_to_and_from_dict():
+    error = MultipleInvalid(
+        [
+            TypeInvalid("expected int", ["a"], error_type="dictionary value"),
+            Invalid("bad", [], error_message="detail"),
+            CodedInvalid(3),
+        ]
+    )
+    data = error.to_dict()
+    assert data == {
+        "type": "MultipleInvalid",
+        "errors": [
+            {"type": "TypeInvalid", "message": "expected int", "path": ["a"], "error_type": "dictionary value"},
+            {"type": "Invalid", "message": "bad", "path": [], "error_message": "detail"},
+            {"type": "CodedInvalid", "message": "bad code 3", "path": [], "error_type": "code"},
+        ],
+    }
+    restored = Invalid.from_dict(data)
+    assert isinstance(restored, MultipleInvalid)
+    assert [type(e) for e in restored.errors] == [TypeInvalid, Invalid, CodedInvalid]
+    assert restored.to_dict() == data
+    unknown = Invalid.from_dict({"type": "Unknown", "message": "x", "path": [1]})
+    assert type(unknown) is Invalid and unknown.path == [1]
+
+
+def test_compile_shared_validators_from_threads():
+    shared = All({"req": int}, required=True)
+    schema = Schema(Any({"opt": int}, shared, discriminant=lambda value, alts: alts))
+    failures = []
+
+    def worker():
+        for _ in range(100):
+            try:
+                schema({})
+                compiled = Schema({"n": shared, "m": Any(shared, {"opt": int})})
+                compiled({"n": {"req": 1}, "m": {}})
+            except Invalid as e:
+                failures.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert failures == []
+    assert not schema.required and not hasattr(shared, "_compiled")
+
+
+def test_self_inside_sub_validator_with_required():
+    schema = Schema({"name": str, Optional("child"): All(Self, required=True)})
+    assert schema({"name": "a", "child": {"name": "b"}}) == {"name": "a", "child": {"name": "b"}}
+    assert schema({"name": "a", "child": {}}) == {"name": "a", "child": {}}
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema({"name": "a", "child": {"name": 1}})
+    assert str(ctx.value) == "expected str for dictionary value @ data['child']['name']"
+
+
+def test_marker_hash_has_no_instance_state():
+    marker = Required("a")
+    assert hash(marker) == hash("a")
+    assert "__hash__" not in vars(marker)
+    remove = Remove("a")
+    assert hash(remove) == object.__hash__(remove)
+    restored = pickle.loads(pickle.dumps(Optional("b", default=1)))
+    assert hash(restored) == hash("b") and restored.default() == 1
+
+
+def test_adaptive_any_from_threads():
+    validator = Any(*[{"kind": "k%d" % i} for i in range(10)], adaptive=True)
+    schema = Schema(validator)
+
+    def worker():
+        for i in range(3000):
+            schema({"kind": "k%d" % (9 - i % 3)})
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    plan = validator.export_plan()
+    assert sorted(plan["order"]) == list(range(10))
+    assert set(plan["order"][:3]) == {7, 8, 9}
+
+
+class SlowLookup:
+    def __init__(self, known, delay=0.05):
+        self.known = known
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, value):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if value not in self.known:
+            raise Invalid("unknown %s" % value)
+        return value.upper()
+
+
+def test_async_schema_runs_values_concurrently():
+    lookup = SlowLookup({"a", "b", "c", "d"})
+    schema = AsyncSchema({Required("owner"): lookup, "reviewers": [lookup], "count": int})
+    result = asyncio.run(schema({"owner": "a", "reviewers": ["b", "c", "d"], "count": 1}))
+    assert result == {"owner": "A", "reviewers": ["B", "C", "D"], "count": 1}
+    assert lookup.peak == 4
+
+    with pytest.raises(MultipleInvalid) as ctx:
+        asyncio.run(schema({"owner": "x", "reviewers": ["b", "y"], "count": "1"}))
+    assert sorted(str(e) for e in ctx.value.errors) == [
+        "expected int for dictionary value @ data['count']",
+        "unknown x for dictionary value @ data['owner']",
+        "unknown y @ data['reviewers'][1]",
+    ]
+
+
+def test_async_schema_concurrency_limit():
+    lookup = SlowLookup({"a"}, delay=0.01)
+    schema = AsyncSchema({"x": [lookup], "y": lookup}, concurrency=2)
+    assert asyncio.run(schema({"x": ["a"] * 6, "y": "a"})) == {"x": ["A"] * 6, "y": "A"}
+    assert lookup.peak == 2
+    results = asyncio.run(schema.validate_many([{"y": "a"}, {"y": "b"}, {"x": ["a", "a"]}]))
+    assert results.outputs == {0: {"y": "A"}, 2: {"x": ["A", "A"]}}
+    assert list(results.errors) == [1]
+    assert lookup.peak == 2
+
+
+def test_async_schema_sub_validators():
+    async def double(value):
+        return value * 2
+
+    schema = AsyncSchema(
+        {
+            "all": All(int, double, Range(max=10)),
+            "any": Any(None, All(str, double)),
+            Optional("child"): Self,
+        }
+    )
+    data = {"all": 2, "any": "ab", "child": {"all": 1, "any": None}}
+    assert asyncio.run(schema(data)) == {"all": 4, "any": "abab", "child": {"all": 2, "any": None}}
+    with pytest.raises(MultipleInvalid) as ctx:
+        asyncio.run(schema({"all": 6, "any": 1}))
+    assert sorted(str(e) for e in ctx.value.errors) == [
+        "not a valid value for dictionary value @ data['any']",
+        "value must be at most 10 for dictionary value @ data['all']",
+    ]
+    assert asyncio.run(schema.is_valid({"all": 1, "any": None}))
+    assert not asyncio.run(schema.is_valid({"all": 6, "any": None}))
+
+
+def test_async_schema_sync_fast_path():
+    schema = AsyncSchema({"a": [int], "b": Any(1, 2)})
+    data = {"a": [1, 2], "b": 1}
+    assert asyncio.run(schema(data)) is data
+    with pytest.raises(MultipleInvalid):
+        asyncio.run(schema({"a": ["x"]}))
+
+
+def test_async_schema_unsupported():
+    async def check(value):
+        return value
+
+    with pytest.raises(SchemaError):
+        AsyncSchema({check: int})
+    with pytest.raises(SchemaError):
+        AsyncSchema(Union({"a": check}, discriminant=lambda value, alts: alts))
+    with pytest.raises(SchemaError):
+        AsyncSchema([check, int])
+    with pytest.raises(SchemaError):
+        AsyncSchema(int, concurrency=0)
+
+
+async def _positive(value):
+    if value < 0:
+        raise Invalid("negative")
+    return value
+
+
+@pytest.mark.parametrize(
+    "schema",
+    [
+        {"a": Msg(_positive, "bad")},
+        {"a": Schema(_positive)},
+        {"a": Schema({"b": _positive})},
+        ExactSequence([_positive]),
+        Unordered([_positive]),
+    ],
+)
+def test_async_schema_rejects_coroutines_inside_wrappers(schema):
+    with pytest.raises(SchemaError):
+        AsyncSchema(schema)
+
+
+def test_async_schema_iter_validate():
+    async def positive(value):
+        if value <= 0:
+            raise Invalid("not positive")
+        return value
+
+    async def collect():
+        return [item async for item in AsyncSchema(positive).iter_validate([1, -1, 2, -2, 3], max_failures=2)]
+
+    outcomes = asyncio.run(collect())
+    assert [index for index, _ in outcomes] == [0, 1, 2, 3]
+    assert outcomes[2] == (2, 2)
+    assert str(outcomes[3][1]) == "not positive"
+
+
+def test_revalidate_only_changed_paths():
+    calls = []
+
+    def counted(value):
+        calls.append(value)
+        return value
+
+    schema = Schema(
+        {
+            Required("name"): str,
+            "servers": [{Required("host"): str, "port": int, "meta": counted}],
+            Optional("mode", default="auto"): Any("auto", "manual"),
+        }
+    )
+    document = schema({"name": "prod", "servers": [{"host": "h%d" % i, "port": i, "meta": i} for i in range(50)]})
+    del calls[:]
+    document["servers"][7]["port"] = 8
+    document["servers"][9]["meta"] = "x"
+    result = schema.revalidate(document, [["servers", 7, "port"], ("servers", 9, "meta")])
+    assert result == document
+    assert calls == ["x"]
+
+    document["servers"][3]["port"] = "80"
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema.revalidate(document, [["servers", 3, "port"]])
+    assert str(ctx.value) == "expected int for dictionary value @ data['servers'][3]['port']"
+    document["servers"][3]["port"] = 80
+
+    del document["mode"]
+    assert schema.revalidate(document, [["mode"]])["mode"] == "auto"
+    assert schema.revalidate(document, []) is document
+
+
+def test_revalidate_structure_of_ancestors():
+    schema = Schema(
+        {
+            "auth": {
+                Exclusive("token", "auth"): str,
+                Exclusive("password", "auth"): str,
+                Inclusive("user", "basic"): str,
+                Inclusive("secret", "basic"): str,
+            },
+            Required("name"): str,
+        }
+    )
+    document = schema({"auth": {"token": "t"}, "name": "n"})
+    document["auth"]["password"] = "p"
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema.revalidate(document, [["auth", "password"]])
+    assert [type(e) for e in ctx.value.errors] == [ExclusiveInvalid]
+    del document["auth"]["password"]
+    document["auth"]["user"] = "u"
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema.revalidate(document, [["auth", "user"]])
+    assert [type(e) for e in ctx.value.errors] == [InclusiveInvalid]
+    del document["auth"]["user"]
+    document["auth"]["other"] = 1
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema.revalidate(document, [["auth", "other"]])
+    assert str(ctx.value) == "extra keys not allowed @ data['auth']['other']"
+    del document["auth"]["other"]
+    del document["name"]
+    with pytest.raises(MultipleInvalid) as ctx:
+        schema.revalidate(document, [["name"]])
+    assert str(ctx.value) == "required key not provided @ data['name']"
+
+
+def test_revalidate_matches_full_validation():
+    schema = Schema(
+        {
+            str: All([{"id": int, Optional("tags", default=[]): [str]}], Length(max=5)),
+            Optional("self"): Self,
+            "coerced": Coerce(int),
+        }
+    )
+    document = schema({"a": [{"id": 1}], "self": {"b": [{"id": 2}]}, "coerced": "1"})
+    patches = [
+        (["a", 0, "tags"], ["x"]),
+        (["self", "b", 0, "id"], 3),
+        (["coerced"], "7"),
+        (["self", "coerced"], "4"),
+        (["c"], [{"id": 4}]),
+    ]
+    for path, value in patches:
+        target = document
+        for key in path[:-1]:
+            target = target[key]
+        target[path[-1]] = value
+        expected = schema(copy.deepcopy(document))
+        document = schema.revalidate(document, [path])
+        assert document == expected
+
+
+def test_result_cache_returns_remembered_outcomes():
+    calls = []
+
+    @pure
+    def counted(v):
+        calls.append(v)
+        return v.lower()
+
+    cache = LRU(2)
+    schema = Schema({"name": counted, "tags": [str]}, cache=cache)
+    data = {"name": "A", "tags": ["x"]}
+    first = schema(data)
+    first["tags"].append("y")
+    assert schema({"name": "A", "tags": ["x"]}) == {"name": "a", "tags": ["x"]}
+    assert calls == ["A"]
+    for _ in range(2):
+        with pytest.raises(MultipleInvalid) as ctx:
+            schema({"name": "A", "tags": [1]})
+        assert str(ctx.value) == "expected str @ data['tags'][0]"
+    assert calls == ["A", "A"]
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 2, 0)
+    assert cache.hit_rate == 0.5
+    schema({"name": "B", "tags": []})
+    assert (len(cache), cache.evictions) == (2, 1)
+
+
+def test_result_cache_keys_on_types_and_returns_unchanged_input():
+    schema = Schema(Any(int, float, Coerce(str)), cache=LRU())
+    assert schema(1) == 1
+    assert schema(True) is True
+    assert str(schema(-0.0)) == "-0.0"
+    assert schema(0.0) == 0.0 and str(schema(0.0)) == "0.0"
+    data = [1, 2]
+    assert Schema([int], cache=LRU())(data) is data
+    unhashable = collections.OrderedDict(a=1)
+    assert Schema({"a": int}, cache=LRU(), extra=ALLOW_EXTRA)(unhashable) == unhashable
+
+
+def test_result_cache_requires_pure_validators():
+    with pytest.raises(SchemaError):
+        Schema({"a": lambda v: v}, cache=LRU())
+    with pytest.raises(SchemaError):
+        Schema([IsFile()], cache=LRU())
+    with pytest.raises(SchemaError):
+        Schema({Optional("a", default=list.__call__): int}, cache=LRU())
+    assert is_pure(
+        {
+            Required("a"): All(str, Length(min=1), Lower),
+            Optional("b", default=[]): [Any(Email(), Url(), None)],
+            "c": Msg(Coerce(int), "bad"),
+            "d": Self,
+        }
+    )
+    assert not is_pure(Any(int, str, discriminant=lambda v, alts: alts))
+
+
+def test_result_cache_pickles_empty_and_is_kept_by_extend():
+    cache = LRU(8)
+    schema = Schema({"a": int}, cache=cache)
+    schema({"a": 1})
+    restored = pickle.loads(pickle.dumps(schema))
+    assert restored.cache.maxsize == 8 and len(restored.cache) == 0
+    assert restored({"a": 1}) == {"a": 1}
+    extended = schema.extend({"b": str})
+    assert extended.cache is cache
+    assert extended({"a": 1, "b": "x"}) == {"a": 1, "b": "x"}
+
+
+def test_memoize_validates_each_distinct_value_once():
+    calls = []
+
+    @pure
+    def domain(v):
+        calls.append(v)
+        return v.split("@")[1]
+
+    memoized = Memoize(domain, maxsize=2)
+    schema = Schema({"to": [memoized], "from": memoized})
+    assert schema({"to": ["a@x.org", "b@y.org", "c@x.org"], "from": "c@x.org"}) == {
+        "to": ["x.org", "y.org", "x.org"],
+        "from": "x.org",
+    }
+    assert calls == ["a@x.org", "b@y.org", "c@x.org"]
+    cache = memoized.cache
+    assert (cache.hits, cache.misses, cache.evictions, len(cache)) == (1, 3, 1, 2)
+    assert memoized("c@x.org") == "x.org"
+    assert cache.hits == 2
+
+
+def test_memoize_reraises_errors_at_each_path():
+    schema = Schema({"a": [Memoize(Coerce(int))], "b": Memoize(Email())})
+    for _ in range(2):
+        with pytest.raises(MultipleInvalid) as ctx:
+            schema({"a": ["1", "x", "x"], "b": "nope"})
+        assert [str(e) for e in ctx.value.errors] == [
+            "expected int @ data['a'][1]",
+            "expected int @ data['a'][2]",
+            "expected an email address for dictionary value @ data['b']",
+        ]
+    assert schema({"a": [1, True]}) == {"a": [1, True]}
+
+
+def test_memoize_requires_a_pure_validator():
+    with pytest.raises(SchemaError):
+        Memoize(lambda v: v)
+    with pytest.raises(SchemaError):
+        Memoize(PathExists())
+    for validator in (Email(), Url(), FqdnUrl(), Match("a"), Datetime(), Coerce(int)):
+        Memoize(validator)
+    shared = LRU(10)
+    assert Memoize(Email(), cache=shared).cache is shared
+
+
+def _outcome(schema, data):
+    try:
+        return schema(data)
+    except MultipleInvalid as e:
+        return [(type(err), str(err)) for err in e.errors]
+
+
+def test_fused_match_alternatives_behave_like_separate_ones():
+    alternatives = [
+        Match("^a+$"),
+        Match("^ab", msg="no ab"),
+        Match(r"(a)\1"),
+        Match("^b(c|d)$"),
+        Match("(?i)^x"),
+        Match(r"^\d+$"),
+        int,
+        Match("^(?P<name>z)z$"),
+        Match("^Y", msg="no y"),
+    ]
+    fused = Schema(Any(*alternatives))
+    separate = Schema(Any(*[All(alternative) for alternative in alternatives]))
+    for value in ["a", "aa", "ab", "bc", "X", "12", 12, "zz", "Y", "q", b"a", None]:
+        assert _outcome(fused, value) == _outcome(separate, value)
+    with pytest.raises(MultipleInvalid) as ctx:
+        Schema(Any(Match("^a", msg="first"), Match("^b")))("c")
+    assert str(ctx.value) == "first"
+
+
+def test_fused_match_keys_pick_the_first_matching_pattern():
+    keys = {Match("^x-"): str, Match("^x-count"): int, Match("^y-"): int, str: bool}
+    fused = Schema(keys)
+    separate = Schema({All(key): value for key, value in keys.items()})
+    for data in [
+        {"x-count": "1"},
+        {"x-count": 1},
+        {"y-a": 1, "x-b": "s"},
+        {"y-a": "1"},
+        {"z": True},
+        {"z": 1},
+        {1: True},
+    ]:
+        assert _outcome(fused, data) == _outcome(separate, data)
+
+
+def test_match_and_replace_share_compiled_patterns():
+    assert Match("^[a-z]+$").pattern is Match("^[a-z]+$").pattern
+    assert Replace("^[a-z]+$", "x").pattern is Match("^[a-z]+$").pattern
+
+
+def test_memoize_keeps_outcomes_of_each_schema_mode_apart():
+    memoized = Memoize({"a": int, "b": int})
+    data = [{"a": "x", "b": "y"}]
+    assert not Schema([memoized]).is_valid(data)
+    assert not Schema([memoized], max_errors=1).is_valid(data)
+    with pytest.raises(MultipleInvalid) as ctx:
+        Schema([memoized])(data)
+    assert sorted(str(e) for e in ctx.value.errors) == [
+        "expected int for dictionary value @ data[0]['a']",
+        "expected int for dictionary value @ data[0]['b']",
+    ]
+
+
+def test_revalidate_matches_full_validation_for_removed_keys():
+    schema = Schema({"a": int, Remove("x"): int, Remove(str): float})
+    for document, path in [
+        ({"a": 1, "x": "y"}, ["x"]),
+        ({"a": 1, "x": 2}, ["x"]),
+        ({"a": 1, "z": 1.5}, ["z"]),
+        ({"a": 1, "z": "q"}, ["z"]),
+    ]:
+        assert _outcome(lambda d: schema.revalidate(d, [path]), dict(document)) == _outcome(
+            schema, dict(document)
+        )
+
+
+def test_async_schema_is_not_a_schema_and_accepts_a_cache():
+    calls = []
+
+    @pure
+    async def upper(value):
+        calls.append(value)
+        return value.upper()
+
+    cache = LRU(10)
+    schema = AsyncSchema({"a": [upper]}, cache=cache)
+    assert not isinstance(schema, Schema)
+    assert not hasattr(schema, "validate_parallel")
+    for _ in range(2):
+        assert asyncio.run(schema({"a": ["x", "y"]})) == {"a": ["X", "Y"]}
+    assert calls == ["x", "y"]
+    assert (cache.hits, cache.misses) == (1, 1)
+    extended = schema.extend({"b": int})
+    assert extended.cache is cache and extended.concurrency is None
+    assert asyncio.run(extended({"a": ["z"], "b": 1})) == {"a": ["Z"], "b": 1}
+    with pytest.raises(SchemaError):
+        AsyncSchema({"a": [lambda v: v]}, cache=LRU())
+
+
+def test_in_validate_batch_with_non_iterable_container():
+    class Even(object):
+        def __contains__(self, value):
+            return value % 2 == 0
+
+    assert In(Even()).validate_batch([2, 4]) == [2, 4]
+    with pytest.raises(MultipleInvalid) as ctx:
+        NotIn(Even()).validate_batch([1, 2])
+    assert [e.path for e in ctx.value.errors] == [[1]]
+
+
+def test_in_message_lists_the_members_it_checked():
+    container = ["a", "b"]
+    validator = In(container)
+    container.append("zz")
+    with pytest.raises(InInvalid, match=r"value must be one of \['a', 'b'\]$"):
+        validator("zz")
+
+    class Even(object):
+        def __contains__(self, value):
+            return value % 2 == 0
+
+    with pytest.raises(NotInInvalid) as ctx:
+        NotIn(Even())(2)
+    assert str(ctx.value).startswith("value must not be one of <")
+
+
+def test_messages_describe_the_data_when_it_failed():
+    data = [1, 2]
+    with pytest.raises(MultipleInvalid) as ctx:
+        Schema(Equal([1]))(data)
+    data.append(99)
+    assert str(ctx.value) == "Values are not equal: value:[1, 2] != target:[1]"
+
+    data = [1, 1]
+    with pytest.raises(Invalid) as unique:
+        Unique()(data)
+    data.append(2)
+    data.append(2)
+    assert str(unique.value) == "contains duplicate items: [1]"
+
+    data = [3]
+    with pytest.raises(Invalid) as unordered:
+        Unordered([int, int])(data)
+    data.append(4)
+    assert str(unordered.value) == "List lengths differ, value:1 != target:2"
+
+    data = {"a": 1}
+    with pytest.raises(Invalid) as literal:
+        Literal({"a": 2})(data)
+    data["a"] = 3
+    assert str(literal.value) == "{'a': 1} not match for {'a': 2}"
+
+
+def test_any_only_reorders_alternatives_that_keep_the_value():
+    calls = []
+
+    def audit(value):
+        calls.append(value)
+        return value
+
+    validate = Schema(Any({"id": audit}, {"id": int}, plan={"order": [1, 0]}))
+    assert validate({"id": 1}) == {"id": 1}
+    assert calls == [1]
+
+    validate = Schema(Any({"id": Coerce(str)}, {"id": int}, plan={"order": [1, 0]}))
+    assert validate({"id": 1}) == {"id": "1"}
+
+    validate = Schema(Any({Optional("id", default=0): int}, {"id": int}, plan={"order": [1, 0]}))
+    assert validate({}) == {"id": 0}
+
+    validate = Schema(Any({"id": str}, {"id": int}, plan={"order": [1, 0]}))
+    assert validate({"id": 1}) == {"id": 1}
+
@@ -2,9 +2,10 @@ import typing
 from voluptuous import validators
 from voluptuous.error import Invalid, LiteralInvalid, TypeInvalid
 from voluptuous.schema_builder import DefaultFactory
-from voluptuous.schema_builder import Schema, default_factory, raises
+from voluptuous.schema_builder import Schema, _pure_default, default_factory, pure, raises
 __author__ = 'tusharmakkar08'
 
+@pure
 def Lower(v: str) -> str:
     """Transform a string to lower case.
 
@@ -12,8 +13,9 @@ def Lower(v: str) -> str:
     >>> s('HI')
     'hi'
     """
-    return v.lower()
+    return str(v).lower()
 
+@pure
 def Upper(v: str) -> str:
     """Transform a string to upper case.
 
@@ -21,8 +23,9 @@ def Upper(v: str) -> str:
     >>> s('hi')
     'HI'
     """
-    return v.upper()
+    return str(v).upper()
 
+@pure
 def Capitalize(v: str) -> str:
     """Capitalise a string.
 
@@ -30,8 +33,9 @@ def Capitalize(v: str) -> str:
     >>> s('hello world')
     'Hello world'
     """
-    return v.capitalize()
+    return str(v).capitalize()
 
+@pure
 def Title(v: str) -> str:
     """Title case a string.
 
@@ -39,8 +43,9 @@ def Title(v: str) -> str:
     >>> s('hello world')
     'Hello World'
     """
-    return v.title()
+    return str(v).title()
 
+@pure
 def Strip(v: str) -> str:
     """Strip whitespace from a string.
 
@@ -48,7 +53,7 @@ def Strip(v: str) -> str:
     >>> s('  hello world  ')
     'hello world'
     """
-    return v.strip()
+    return str(v).strip()
 
 class DefaultTo(object):
     """Sets a value to default_value if none provided.
@@ -70,6 +75,12 @@ class DefaultTo(object):
             v = self.default_value()
         return v
 
+    def __voluptuous_fingerprint__(self):
+        return (self.default_value, self.msg)
+
+    def __voluptuous_pure__(self):
+        return _pure_default(self.default_value)
+
     def __repr__(self):
         return 'DefaultTo(%s)' % (self.default_value(),)
 
@@ -89,6 +100,12 @@ class SetTo(object):
     def __call__(self, v):
         return self.value()
 
+    def __voluptuous_fingerprint__(self):
+        return (self.value,)
+
+    def __voluptuous_pure__(self):
+        return _pure_default(self.value)
+
     def __repr__(self):
         return 'SetTo(%s)' % (self.value(),)
 
@@ -103,6 +120,7 @@ class Set(object):
     >>> with raises(Invalid, regex="^cannot be presented as set: "):
     ...   s([set([1, 2]), set([3, 4])])
     """
+    __voluptuous_pure__ = True
 
     def __init__(self, msg: typing.Optional[str]=None) -> None:
         self.msg = msg
@@ -114,10 +132,14 @@ class Set(object):
             raise TypeInvalid(self.msg or 'cannot be presented as set: {0}'.format(e))
         return set_v
 
+    def __voluptuous_fingerprint__(self):
+        return (self.msg,)
+
     def __repr__(self):
         return 'Set()'
 
 class Literal(object):
+    __voluptuous_pure__ = True
 
     def __init__(self, lit) -> None:
         self.lit = lit
@@ -131,5 +153,8 @@ class Literal(object):
     def __str__(self):
         return str(self.lit)
 
+    def __voluptuous_fingerprint__(self):
+        return (self.lit,)
+
     def __repr__(self):
         return repr(self.lit)
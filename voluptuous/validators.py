@@ -1,13 +1,16 @@
 from __future__ import annotations
+import collections.abc
 import datetime
+import heapq
 import os
 import re
 import sys
+import threading
 import typing
 from decimal import Decimal, InvalidOperation
-from functools import wraps
-from voluptuous.error import AllInvalid, AnyInvalid, BooleanInvalid, CoerceInvalid, ContainsInvalid, DateInvalid, DatetimeInvalid, DirInvalid, EmailInvalid, ExactSequenceInvalid, FalseInvalid, FileInvalid, InInvalid, Invalid, LengthInvalid, MatchInvalid, MultipleInvalid, NotEnoughValid, NotInInvalid, PathInvalid, RangeInvalid, TooManyValid, TrueInvalid, TypeInvalid, UrlInvalid
-from voluptuous.schema_builder import Schema, Schemable, message, raises
+from functools import lru_cache, partial, wraps
+from voluptuous.error import AllInvalid, AnyInvalid, BooleanInvalid, CoerceInvalid, ContainsInvalid, DateInvalid, DatetimeInvalid, DictInvalid, DirInvalid, EmailInvalid, ExactSequenceInvalid, FalseInvalid, FileInvalid, InInvalid, Invalid, LengthInvalid, MatchInvalid, MultipleInvalid, NotEnoughValid, NotInInvalid, PathInvalid, RangeInvalid, RequiredFieldInvalid, SchemaError, TooManyValid, TrueInvalid, TypeInvalid, UrlInvalid
+from voluptuous.schema_builder import LRU, REMOVE_EXTRA, UNDEFINED, Extra, Marker, Remove, Schema, Schemable, _cached_validator, _standard_scalars, is_pure, message, primitive_types, pure, raises
 if typing.TYPE_CHECKING:
     from _typeshed import SupportsAllComparisons
 Enum: typing.Union[type, None]
@@ -22,6 +25,8 @@ else:
     import urlparse
 USER_REGEX = re.compile('(?:(^[-!#$%&\'*+/=?^_`{}|~0-9A-Z]+(\\.[-!#$%&\'*+/=?^_`{}|~0-9A-Z]+)*$|^"([\\001-\\010\\013\\014\\016-\\037!#-\\[\\]-\\177]|\\\\[\\001-\\011\\013\\014\\016-\\177])*"$))\\Z', re.IGNORECASE)
 DOMAIN_REGEX = re.compile('(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\\.)+(?:[A-Z]{2,6}\\.?|[A-Z0-9-]{2,}\\.?$)|^\\[(25[0-5]|2[0-4]\\d|[0-1]?\\d?\\d)(\\.(25[0-5]|2[0-4]\\d|[0-1]?\\d?\\d)){3}\\]$)\\Z', re.IGNORECASE)
+_LITERAL_TYPES = frozenset((*primitive_types, type(None)))
+_adapt_lock = threading.Lock()
 __author__ = 'tusharmakkar08'
 
 def truth(f: typing.Callable) -> typing.Callable:
@@ -36,13 +41,14 @@ def truth(f: typing.Callable) -> typing.Callable:
     >>> with raises(MultipleInvalid, 'not a valid value'):
     ...   validate('/notavaliddir')
     """
+
     @wraps(f)
-    def wrapper(v):
+    def check(v):
         t = f(v)
         if not t:
             raise ValueError
         return v
-    return wrapper
+    return check
 
 class Coerce(object):
     """Coerce a value to a type.
@@ -79,11 +85,18 @@ class Coerce(object):
                 msg += ' or one of %s' % str([e.value for e in self.type])[1:-1]
             raise CoerceInvalid(msg)
 
+    def __voluptuous_fingerprint__(self):
+        return (self.type, self.msg)
+
+    def __voluptuous_pure__(self):
+        return is_pure(self.type)
+
     def __repr__(self):
         return 'Coerce(%s, msg=%r)' % (self.type_name, self.msg)
 
 @message('value was not true', cls=TrueInvalid)
 @truth
+@pure
 def IsTrue(v):
     """Assert that a value is true, in the Python sense.
 
@@ -106,9 +119,10 @@ def IsTrue(v):
     ... except MultipleInvalid as e:
     ...   assert isinstance(e.errors[0], TrueInvalid)
     """
-    return bool(v)
+    return v
 
 @message('value was not false', cls=FalseInvalid)
+@pure
 def IsFalse(v):
     """Assert that a value is false, in the Python sense.
 
@@ -125,9 +139,12 @@ def IsFalse(v):
     ... except MultipleInvalid as e:
     ...   assert isinstance(e.errors[0], FalseInvalid)
     """
-    return not bool(v)
+    if v:
+        raise ValueError
+    return v
 
 @message('expected boolean', cls=BooleanInvalid)
+@pure
 def Boolean(v):
     """Convert human-readable boolean values to a bool.
 
@@ -148,7 +165,7 @@ def Boolean(v):
     ... except MultipleInvalid as e:
     ...   assert isinstance(e.errors[0], BooleanInvalid)
     """
-    if isinstance(v, str):
+    if isinstance(v, basestring):
         v = v.lower()
         if v in ('1', 'true', 'yes', 'on', 'enable'):
             return True
@@ -172,21 +189,72 @@ class _WithSubValidators(object):
         self.discriminant = discriminant
 
     def __voluptuous_compile__(self, schema: Schema) -> typing.Callable:
-        self._compiled = []
-        old_required = schema.required
-        self.schema = schema
-        for v in self.validators:
-            schema.required = self.required
-            self._compiled.append(schema._compile(v))
-        schema.required = old_required
-        return self._run
+        schema = schema._with_required(self.required)
+        return partial(self._run, schema, self._compile_validators(schema))
+
+    def _compile_validators(self, schema: Schema) -> typing.List[typing.Callable]:
+        schema = schema._with_required(self.required)
+        return [schema._compile(v) for v in self.validators]
+
+    def _run(self, schema: Schema, compiled: typing.List[typing.Callable], path: typing.List[typing.Hashable], value):
+        if self.discriminant is not None:
+            compiled = [schema._compile(v) for v in self.discriminant(value, self.validators)]
+        return self._exec(compiled, value, path)
 
     def __call__(self, v):
         return self._exec((Schema(val) for val in self.validators), v)
 
+    def __voluptuous_fingerprint__(self):
+        return (self.validators, self.msg, self.required, self.discriminant)
+
+    def __voluptuous_pure__(self):
+        return self.discriminant is None and all((is_pure(v) for v in self.validators))
+
     def __repr__(self):
         return '%s(%s, msg=%r)' % (self.__class__.__name__, ', '.join((repr(v) for v in self.validators)), self.msg)
 
+    def _exec(self, funcs: typing.Iterable, v, path: typing.Optional[typing.List[typing.Hashable]]=None):
+        raise NotImplementedError()
+
+def _raise(error: Invalid, path: typing.List[typing.Hashable], value) -> typing.NoReturn:
+    raise error
+
+def _keeps_value(schema: Schemable, extra: int) -> bool:
+    """Return whether `schema` only checks values, returning them unchanged.
+
+    That holds for literals, types, and dict, list, tuple and set schemas
+    made of them, unless a key has a default or is removed. Validators may
+    have side effects or change the value, so they never do.
+    """
+    if schema is Extra or type(schema) in primitive_types or schema is None or type(schema) is type:
+        return True
+    if isinstance(schema, Marker):
+        return not isinstance(schema, Remove) and getattr(schema, 'default', UNDEFINED) is UNDEFINED and _keeps_value(schema.schema, extra)
+    if type(schema) is dict:
+        return extra != REMOVE_EXTRA and all((_keeps_value(k, extra) and _keeps_value(v, extra) for k, v in schema.items()))
+    if isinstance(schema, (list, tuple, set, frozenset)):
+        return all((_keeps_value(v, extra) for v in schema))
+    return False
+
+def _trial_order(order: typing.List[int], movable: typing.List[bool]) -> typing.List[int]:
+    """Sort each run of movable alternatives by their rank in `order`.
+
+    Other alternatives may have side effects or change the value, so they
+    stay in place and delimit the runs that may be reordered.
+    """
+    rank = {index: position for position, index in enumerate(order)}
+    trial: typing.List[int] = []
+    run: typing.List[int] = []
+    for index, can_move in enumerate(movable):
+        if not can_move:
+            trial.extend(sorted(run, key=rank.__getitem__))
+            trial.append(index)
+            run = []
+        else:
+            run.append(index)
+    trial.extend(sorted(run, key=rank.__getitem__))
+    return trial
+
 class Any(_WithSubValidators):
     """Use the first validated value.
 
@@ -210,7 +278,171 @@ class Any(_WithSubValidators):
     1
     >>> with raises(MultipleInvalid, "Expected 1 2 or 3"):
     ...   validate(4)
+
+    When compiled by a schema, literal alternatives are looked up in a hash
+    table and type alternatives are selected by the type of the value, so
+    only the alternatives that may accept the value are tried, in order.
+
+    :param adaptive: Count how often each alternative matches and every
+        `adapt_interval` matches, try the most frequent ones first. Only
+        literals, types and dict, list, tuple and set schemas made of them
+        are moved, and never past an alternative of another kind, so the
+        value returned does not depend on the order.
+    :param plan: A trial order returned by `export_plan` to start from.
+
+    >>> validate = Schema(Any({'kind': 'a'}, {'kind': 'b'}, adaptive=True))
+    >>> for _ in range(Any.adapt_interval):
+    ...   _ = validate({'kind': 'b'})
+    >>> validate.schema.export_plan()['order']
+    [1, 0]
     """
+    adapt_interval = 1000
+
+    def __init__(self, *validators, adaptive: bool=False, plan: typing.Optional[typing.Dict[str, typing.List[int]]]=None, **kwargs) -> None:
+        super(Any, self).__init__(*validators, **kwargs)
+        self.adaptive = adaptive
+        self._order = list(range(len(validators)))
+        self._hits = [0] * len(validators)
+        self._calls = 0
+        if plan is not None:
+            self.load_plan(plan)
+
+    def __voluptuous_compile__(self, schema: Schema) -> typing.Callable:
+        if self.discriminant is not None:
+            return super(Any, self).__voluptuous_compile__(schema)
+        compiled = self._compile_validators(schema)
+        if _standard_scalars(schema):
+            for start, end, fused, _ in _fused_match_runs(self.validators):
+                compiled[start] = partial(_validate_fused, fused, compiled[start])
+                for index in range(start + 1, end):
+                    compiled[index] = partial(_match_failed, self.validators[index])
+        keys = [schema._dispatch_key(v) for v in self.validators]
+        if all((key is None for key in keys)):
+            return partial(self._run, schema, compiled)
+        adaptive = self.adaptive
+        movable = [key is not None and _keeps_value(v, schema.extra) for key, v in zip(keys, self.validators)]
+
+        def prepare(order):
+            trial = _trial_order(order, movable)
+            rank = [0] * len(trial)
+            literals: typing.Dict[typing.Any, int] = {}
+            for position, index in enumerate(trial):
+                rank[index] = position
+                if keys[index] is not None and keys[index][0] == 'literal':
+                    literals.setdefault(keys[index][1], index)
+            plans: typing.Dict[type, typing.Tuple[typing.List[int], typing.Optional[int]]] = {}
+            return (order, trial, rank, literals, plans)
+
+        def plan(trial, type_):
+            candidates: typing.List[int] = []
+            for index in trial:
+                key = keys[index]
+                if key is None:
+                    candidates.append(index)
+                elif key[0] == 'literal':
+                    if type_ not in _LITERAL_TYPES:
+                        candidates.append(index)
+                elif issubclass(type_, key[1]):
+                    if key[0] == 'type':
+                        return (candidates, index)
+                    candidates.append(index)
+            return (candidates, None)
+        state = prepare(self._order)
+
+        def validate_any(path, value):
+            nonlocal state
+            if state[0] is not self._order:
+                state = prepare(self._order)
+            order, trial, rank, literals, plans = state
+            type_ = type(value)
+            try:
+                candidates, accepted = plans[type_]
+            except KeyError:
+                candidates, accepted = plans[type_] = plan(trial, type_)
+            if literals and type_ in _LITERAL_TYPES:
+                hit = literals.get(value)
+                if hit is not None and (accepted is None or rank[hit] < rank[accepted]):
+                    accepted = hit
+            limit = len(rank) if accepted is None else rank[accepted]
+            errors = None
+            for index in candidates:
+                if rank[index] > limit:
+                    break
+                try:
+                    result = compiled[index](path, value)
+                except Invalid as e:
+                    if errors is None:
+                        errors = {}
+                    errors[index] = e
+                    continue
+                if adaptive:
+                    self._record_hit(index)
+                return result
+            if accepted is not None:
+                if adaptive:
+                    self._record_hit(accepted)
+                return value
+            errors = errors or {}
+            return self._exec([partial(_raise, errors[index]) if index in errors else func for index, func in enumerate(compiled)], value, path)
+        return validate_any
+
+    def _record_hit(self, index: int) -> None:
+        self._hits[index] += 1
+        self._calls += 1
+        if self._calls >= self.adapt_interval:
+            with _adapt_lock:
+                if self._calls < self.adapt_interval:
+                    return
+                hits = self._hits
+                self._hits = [count // 2 for count in hits]
+                self._calls = 0
+                self._order = sorted(range(len(hits)), key=lambda i: -hits[i])
+
+    def export_plan(self) -> typing.Dict[str, typing.List[int]]:
+        """Return the learned trial order and hit counts.
+
+        The result only holds lists of integers, so it can be stored as JSON
+        and passed back with `load_plan` or ``Any(..., plan=...)``.
+        """
+        return {'order': list(self._order), 'hits': list(self._hits)}
+
+    def load_plan(self, plan: typing.Dict[str, typing.List[int]]) -> None:
+        """Restore a trial order returned by `export_plan`.
+
+        With `compile_cache` enabled, load the plan before building schemas
+        that use this validator, as equal validators without a plan share
+        their compiled form.
+        """
+        count = len(self.validators)
+        order = list(plan['order'])
+        hits = list(plan.get('hits', [0] * count))
+        if sorted(order) != list(range(count)) or len(hits) != count:
+            raise SchemaError('plan does not match the %d alternatives of %r' % (count, self))
+        self._hits = hits
+        self._calls = 0
+        self._order = order
+
+    def __voluptuous_fingerprint__(self):
+        fingerprint = super(Any, self).__voluptuous_fingerprint__()
+        if self.adaptive or self._order != list(range(len(self.validators))):
+            return fingerprint + (self.adaptive, id(self))
+        return fingerprint
+
+    def _exec(self, funcs, v, path=None):
+        error = None
+        for func in funcs:
+            try:
+                if path is None:
+                    return func(v)
+                else:
+                    return func(path, v)
+            except Invalid as e:
+                if error is None or len(e.path) > len(error.path):
+                    error = e
+        else:
+            if error:
+                raise error if self.msg is None else AnyInvalid(self.msg, path=path)
+            raise AnyInvalid(self.msg or 'no valid value found', path=path)
 Or = Any
 
 class Union(_WithSubValidators):
@@ -232,7 +464,80 @@ class Union(_WithSubValidators):
     ```discriminant({'type':'b', 'a_val':'5'}, [{'type':'a', 'a_val':'1'},{'type':'b', 'b_val':'2'}])``` is invoked
 
     Without the discriminant, the exception would be "extra keys not allowed @ data['b_val']"
+
+    :param tag: Key whose literal value selects the alternative. Every
+        alternative must then be a dict with a literal value for this key.
+        The alternative is found with a single lookup when compiled, and
+        only its errors are reported.
+
+    >>> validate = Schema(Union({'type': 'a', 'a_val': int}, {'type': 'b', 'b_val': int}, tag='type'))
+    >>> validate({'type': 'b', 'b_val': 2}) == {'type': 'b', 'b_val': 2}
+    True
+    >>> with raises(MultipleInvalid, "expected int for dictionary value @ data['b_val']"):
+    ...   validate({'type': 'b', 'b_val': '2'})
+    >>> with raises(MultipleInvalid, "value must be one of ['a', 'b'] @ data['type']"):
+    ...   validate({'type': 'c'})
     """
+
+    def __init__(self, *validators, tag: typing.Optional[typing.Hashable]=None, **kwargs) -> None:
+        super(Union, self).__init__(*validators, **kwargs)
+        if tag is not None and self.discriminant is not None:
+            raise SchemaError('Union accepts either a tag or a discriminant')
+        self.tag = tag
+
+    def __voluptuous_compile__(self, schema: Schema) -> typing.Callable:
+        if self.tag is None:
+            return super(Union, self).__voluptuous_compile__(schema)
+        tag = self.tag
+        compiled = self._compile_validators(schema)
+        branches: typing.Dict[typing.Hashable, typing.List[typing.Callable]] = {}
+        for validator, func in zip(self.validators, compiled):
+            branches.setdefault(self._tag_value(validator), []).append(func)
+
+        def validate_union(path, value):
+            if not isinstance(value, dict):
+                raise DictInvalid('expected a dictionary', path)
+            if tag not in value:
+                raise RequiredFieldInvalid(self.msg or 'required key not provided', path + [tag])
+            try:
+                funcs = branches.get(value[tag])
+            except TypeError:
+                funcs = None
+            if funcs is None:
+                raise InInvalid(self.msg or (lambda: f'value must be one of {_format_members(branches)}'), path + [tag])
+            return self._exec(funcs, value, path)
+        return validate_union
+
+    def _tag_value(self, validator: Schemable) -> typing.Hashable:
+        if isinstance(validator, dict):
+            for key, value in validator.items():
+                if (key.schema if isinstance(key, Marker) else key) == self.tag and (type(value) in primitive_types or value is None):
+                    return value
+        raise SchemaError('Union alternatives must be dicts with a literal value for tag %r, not %r' % (self.tag, validator))
+
+    def __call__(self, v):
+        if self.tag is None:
+            return super(Union, self).__call__(v)
+        return Schema(self)(v)
+
+    def __voluptuous_fingerprint__(self):
+        return super(Union, self).__voluptuous_fingerprint__() + (self.tag,)
+
+    def _exec(self, funcs, v, path=None):
+        error = None
+        for func in funcs:
+            try:
+                if path is None:
+                    return func(v)
+                else:
+                    return func(path, v)
+            except Invalid as e:
+                if error is None or len(e.path) > len(error.path):
+                    error = e
+        else:
+            if error:
+                raise error if self.msg is None else AnyInvalid(self.msg, path=path)
+            raise AnyInvalid(self.msg or 'no valid value found', path=path)
 Switch = Union
 
 class All(_WithSubValidators):
@@ -247,8 +552,78 @@ class All(_WithSubValidators):
     >>> validate('10')
     10
     """
+
+    def _exec(self, funcs, v, path=None):
+        try:
+            for func in funcs:
+                if path is None:
+                    v = func(v)
+                else:
+                    v = func(path, v)
+        except Invalid as e:
+            raise e if self.msg is None else AllInvalid(self.msg, path=path)
+        return v
 And = All
 
+@lru_cache(maxsize=1024)
+def _compile_pattern(pattern: str, flags: int=0) -> re.Pattern:
+    """Compile `pattern`, returning the same object for the same pattern and flags."""
+    return re.compile(pattern, flags)
+_UNFUSIBLE_SOURCE = re.compile('\\\\[0-9]|\\(\\?P=|\\(\\?\\(|\\(\\?[aiLmsux]+\\)')
+
+def _fusible(validator) -> bool:
+    """Return whether `validator` is a `Match` whose pattern can be part of an alternation.
+
+    Patterns with numbered backreferences or conditionals would refer to
+    the wrong groups, and global inline flags are only allowed at the start.
+    """
+    if type(validator) is not Match:
+        return False
+    pattern = validator.pattern
+    return isinstance(pattern.pattern, str) and (not pattern.flags & re.VERBOSE) and (not _UNFUSIBLE_SOURCE.search(pattern.pattern))
+
+def _fused_match_runs(validators: typing.Sequence) -> typing.List[typing.Tuple[int, int, re.Pattern, typing.Dict[int, int]]]:
+    """Fuse each run of consecutive `Match` validators with the same flags.
+
+    Returns ``(start, end, fused, members)`` for each run of at least two
+    validators, where `fused` matches the alternation of their patterns,
+    each in a named group, and `members` maps the group numbers to the
+    positions of the validators. Since alternatives are tried in order,
+    ``fused.match(v).lastindex`` selects the first validator matching `v`.
+    """
+    runs = []
+    start = 0
+    while start < len(validators):
+        end = start + 1
+        if _fusible(validators[start]):
+            flags = validators[start].pattern.flags
+            while end < len(validators) and _fusible(validators[end]) and (validators[end].pattern.flags == flags):
+                end += 1
+        if end - start > 1:
+            try:
+                fused = _compile_pattern('|'.join(('(?P<_%d>%s)' % (index, validators[index].pattern.pattern) for index in range(start, end))), flags)
+            except re.error:
+                fused = None
+            if fused is not None:
+                runs.append((start, end, fused, {fused.groupindex['_%d' % index]: index for index in range(start, end)}))
+        start = end
+    return runs
+
+def _validate_fused(fused: re.Pattern, first: typing.Callable, path: typing.List[typing.Hashable], value):
+    try:
+        match = fused.match(value)
+    except TypeError:
+        match = None
+    if match is None:
+        return first(path, value)
+    return value
+
+def _match_failed(validator: Match, path: typing.List[typing.Hashable], value) -> typing.NoReturn:
+    """Raise the error of `validator` for a value none of its fused run matched."""
+    if not isinstance(value, str):
+        raise MatchInvalid('expected string or buffer', path)
+    raise validator._mismatch(path)
+
 class Match(object):
     """Value must be a string that matches the regular expression.
 
@@ -266,11 +641,23 @@ class Match(object):
     >>> validate = Schema(Match(re.compile(r'0x[A-F0-9]+', re.I)))
     >>> validate('0x123ef4')
     '0x123ef4'
+
+    String patterns are compiled through a shared cache, so `Match` and
+    `Replace` instances with the same pattern share one compiled expression.
+    When compiled by a schema, consecutive `Match` alternatives of an `Any`,
+    and `Match` keys of a dictionary, are fused into a single alternation
+    with a named group per pattern, so a value is scanned once to find the
+    first pattern it matches:
+
+    >>> validate = Schema({Match('^x-'): str, Match('^y-'): int})
+    >>> validate({'x-trace': 'a', 'y-retries': 3})
+    {'x-trace': 'a', 'y-retries': 3}
     """
+    __voluptuous_pure__ = True
 
     def __init__(self, pattern: typing.Union[re.Pattern, str], msg: typing.Optional[str]=None) -> None:
         if isinstance(pattern, basestring):
-            pattern = re.compile(pattern)
+            pattern = _compile_pattern(pattern)
         self.pattern = pattern
         self.msg = msg
 
@@ -280,9 +667,15 @@ class Match(object):
         except TypeError:
             raise MatchInvalid('expected string or buffer')
         if not match:
-            raise MatchInvalid(self.msg or 'does not match regular expression {}'.format(self.pattern.pattern))
+            raise self._mismatch()
         return v
 
+    def _mismatch(self, path: typing.Optional[typing.List[typing.Hashable]]=None) -> MatchInvalid:
+        return MatchInvalid(self.msg or (lambda: 'does not match regular expression {}'.format(self.pattern.pattern)), path)
+
+    def __voluptuous_fingerprint__(self):
+        return (self.pattern, self.msg)
+
     def __repr__(self):
         return 'Match(%r, msg=%r)' % (self.pattern.pattern, self.msg)
 
@@ -294,10 +687,11 @@ class Replace(object):
     >>> validate('you say hello')
     'I say goodbye'
     """
+    __voluptuous_pure__ = True
 
     def __init__(self, pattern: typing.Union[re.Pattern, str], substitution: str, msg: typing.Optional[str]=None) -> None:
         if isinstance(pattern, basestring):
-            pattern = re.compile(pattern)
+            pattern = _compile_pattern(pattern)
         self.pattern = pattern
         self.substitution = substitution
         self.msg = msg
@@ -305,10 +699,20 @@ class Replace(object):
     def __call__(self, v):
         return self.pattern.sub(self.substitution, v)
 
+    def __voluptuous_fingerprint__(self):
+        return (self.pattern, self.substitution, self.msg)
+
     def __repr__(self):
         return 'Replace(%r, %r, msg=%r)' % (self.pattern.pattern, self.substitution, self.msg)
 
+def _url_validation(v: str) -> urlparse.ParseResult:
+    parsed = urlparse.urlparse(v)
+    if not parsed.scheme or not parsed.netloc:
+        raise UrlInvalid('must have a URL scheme and host')
+    return parsed
+
 @message('expected an email address', cls=EmailInvalid)
+@pure
 def Email(v):
     """Verify that the value is an email address or not.
 
@@ -322,18 +726,18 @@ def Email(v):
     >>> s('t@x.com')
     't@x.com'
     """
-    if not isinstance(v, str):
-        raise ValueError
-    if '@' not in v:
-        raise ValueError
-    user, domain = v.rsplit('@', 1)
-    if not USER_REGEX.match(user):
-        raise ValueError
-    if not DOMAIN_REGEX.match(domain):
+    try:
+        if not v or '@' not in v:
+            raise EmailInvalid('Invalid email address')
+        user_part, domain_part = v.rsplit('@', 1)
+        if not (USER_REGEX.match(user_part) and DOMAIN_REGEX.match(domain_part)):
+            raise EmailInvalid('Invalid email address')
+        return v
+    except:
         raise ValueError
-    return v
 
 @message('expected a fully qualified domain name URL', cls=UrlInvalid)
+@pure
 def FqdnUrl(v):
     """Verify that the value is a fully qualified domain name URL.
 
@@ -343,16 +747,16 @@ def FqdnUrl(v):
     >>> s('http://w3.org')
     'http://w3.org'
     """
-    if not isinstance(v, str):
-        raise ValueError
-    parsed = urlparse.urlparse(v)
-    if not parsed.scheme or not parsed.netloc:
-        raise ValueError
-    if parsed.netloc == 'localhost':
+    try:
+        parsed_url = _url_validation(v)
+        if '.' not in parsed_url.netloc:
+            raise UrlInvalid('must have a domain name in URL')
+        return v
+    except:
         raise ValueError
-    return v
 
 @message('expected a URL', cls=UrlInvalid)
+@pure
 def Url(v):
     """Verify that the value is a URL.
 
@@ -362,12 +766,11 @@ def Url(v):
     >>> s('http://w3.org')
     'http://w3.org'
     """
-    if not isinstance(v, str):
-        raise ValueError
-    parsed = urlparse.urlparse(v)
-    if not parsed.scheme or not parsed.netloc:
+    try:
+        _url_validation(v)
+        return v
+    except:
         raise ValueError
-    return v
 
 @message('Not a file', cls=FileInvalid)
 @truth
@@ -381,7 +784,14 @@ def IsFile(v):
     >>> with raises(FileInvalid, 'Not a file'):
     ...   IsFile()(None)
     """
-    return os.path.isfile(v)
+    try:
+        if v:
+            v = str(v)
+            return os.path.isfile(v)
+        else:
+            raise FileInvalid('Not a file')
+    except TypeError:
+        raise FileInvalid('Not a file')
 
 @message('Not a directory', cls=DirInvalid)
 @truth
@@ -393,7 +803,14 @@ def IsDir(v):
     >>> with raises(DirInvalid, 'Not a directory'):
     ...   IsDir()(None)
     """
-    return os.path.isdir(v)
+    try:
+        if v:
+            v = str(v)
+            return os.path.isdir(v)
+        else:
+            raise DirInvalid('Not a directory')
+    except TypeError:
+        raise DirInvalid('Not a directory')
 
 @message('path does not exist', cls=PathInvalid)
 @truth
@@ -407,7 +824,14 @@ def PathExists(v):
     >>> with raises(PathInvalid, 'Not a Path'):
     ...   PathExists()(None)
     """
-    return os.path.exists(v)
+    try:
+        if v:
+            v = str(v)
+            return os.path.exists(v)
+        else:
+            raise PathInvalid('Not a Path')
+    except TypeError:
+        raise PathInvalid('Not a Path')
 
 def Maybe(validator: Schemable, msg: typing.Optional[str]=None):
     """Validate that the object matches given validator or is None.
@@ -422,13 +846,7 @@ def Maybe(validator: Schemable, msg: typing.Optional[str]=None):
     ...  s("string")
 
     """
-    schema = Schema(validator)
-    @wraps(validator)
-    def f(v):
-        if v is None:
-            return v
-        return schema(v)
-    return f
+    return Any(None, validator, msg=msg)
 
 class Range(object):
     """Limit a value to a range.
@@ -450,6 +868,7 @@ class Range(object):
     >>> with raises(MultipleInvalid, 'value must be lower than 10'):
     ...   Schema(Range(max=10, max_included=False))(20)
     """
+    __voluptuous_pure__ = True
 
     def __init__(self, min: SupportsAllComparisons | None=None, max: SupportsAllComparisons | None=None, min_included: bool=True, max_included: bool=True, msg: typing.Optional[str]=None) -> None:
         self.min = min
@@ -462,20 +881,23 @@ class Range(object):
         try:
             if self.min_included:
                 if self.min is not None and (not v >= self.min):
-                    raise RangeInvalid(self.msg or 'value must be at least %s' % self.min)
+                    raise RangeInvalid(self.msg or (lambda: 'value must be at least %s' % self.min))
             elif self.min is not None and (not v > self.min):
-                raise RangeInvalid(self.msg or 'value must be higher than %s' % self.min)
+                raise RangeInvalid(self.msg or (lambda: 'value must be higher than %s' % self.min))
             if self.max_included:
                 if self.max is not None and (not v <= self.max):
-                    raise RangeInvalid(self.msg or 'value must be at most %s' % self.max)
+                    raise RangeInvalid(self.msg or (lambda: 'value must be at most %s' % self.max))
             elif self.max is not None and (not v < self.max):
-                raise RangeInvalid(self.msg or 'value must be lower than %s' % self.max)
+                raise RangeInvalid(self.msg or (lambda: 'value must be lower than %s' % self.max))
             return v
         except TypeError:
             raise RangeInvalid(self.msg or 'invalid value or type (must have a partial ordering)')
 
+    def __voluptuous_fingerprint__(self):
+        return (self.min, self.max, self.min_included, self.max_included, self.msg)
+
     def __repr__(self):
-        return f'Range(min={self.min!r}, max={self.max!r}, min_included={self.min_included!r}, max_included={self.max_included!r}, msg={self.msg!r})'
+        return 'Range(min=%r, max=%r, min_included=%r, max_included=%r, msg=%r)' % (self.min, self.max, self.min_included, self.max_included, self.msg)
 
 class Clamp(object):
     """Clamp a value to a range.
@@ -490,6 +912,7 @@ class Clamp(object):
     >>> s(-1)
     0
     """
+    __voluptuous_pure__ = True
 
     def __init__(self, min: SupportsAllComparisons | None=None, max: SupportsAllComparisons | None=None, msg: typing.Optional[str]=None) -> None:
         self.min = min
@@ -506,11 +929,15 @@ class Clamp(object):
         except TypeError:
             raise RangeInvalid(self.msg or 'invalid value or type (must have a partial ordering)')
 
+    def __voluptuous_fingerprint__(self):
+        return (self.min, self.max, self.msg)
+
     def __repr__(self):
-        return f'Clamp(min={self.min!r}, max={self.max!r})'
+        return 'Clamp(min=%s, max=%s)' % (self.min, self.max)
 
 class Length(object):
     """The length of a value must be in a certain range."""
+    __voluptuous_pure__ = True
 
     def __init__(self, min: SupportsAllComparisons | None=None, max: SupportsAllComparisons | None=None, msg: typing.Optional[str]=None) -> None:
         self.min = min
@@ -520,18 +947,22 @@ class Length(object):
     def __call__(self, v):
         try:
             if self.min is not None and len(v) < self.min:
-                raise LengthInvalid(self.msg or 'length of value must be at least %s' % self.min)
+                raise LengthInvalid(self.msg or (lambda: 'length of value must be at least %s' % self.min))
             if self.max is not None and len(v) > self.max:
-                raise LengthInvalid(self.msg or 'length of value must be at most %s' % self.max)
+                raise LengthInvalid(self.msg or (lambda: 'length of value must be at most %s' % self.max))
             return v
         except TypeError:
             raise RangeInvalid(self.msg or 'invalid value or type')
 
+    def __voluptuous_fingerprint__(self):
+        return (self.min, self.max, self.msg)
+
     def __repr__(self):
         return 'Length(min=%s, max=%s)' % (self.min, self.max)
 
 class Datetime(object):
     """Validate that the value matches the datetime format."""
+    __voluptuous_pure__ = True
     DEFAULT_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
 
     def __init__(self, format: typing.Optional[str]=None, msg: typing.Optional[str]=None) -> None:
@@ -542,9 +973,12 @@ class Datetime(object):
         try:
             datetime.datetime.strptime(v, self.format)
         except (TypeError, ValueError):
-            raise DatetimeInvalid(self.msg or 'value does not match expected format %s' % self.format)
+            raise DatetimeInvalid(self.msg or (lambda: 'value does not match expected format %s' % self.format))
         return v
 
+    def __voluptuous_fingerprint__(self):
+        return (self.format, self.msg)
+
     def __repr__(self):
         return 'Datetime(format=%s)' % self.format
 
@@ -556,56 +990,150 @@ class Date(Datetime):
         try:
             datetime.datetime.strptime(v, self.format)
         except (TypeError, ValueError):
-            raise DateInvalid(self.msg or 'value does not match expected format %s' % self.format)
+            raise DateInvalid(self.msg or (lambda: 'value does not match expected format %s' % self.format))
         return v
 
     def __repr__(self):
         return 'Date(format=%s)' % self.format
 
+def _format_members(container: typing.Iterable, limit: int=20) -> str:
+    """Format the sorted members of `container` for a message, keeping `limit` at most."""
+    members = list(container)
+    try:
+        shown = heapq.nsmallest(limit, members)
+    except TypeError:
+        shown = heapq.nsmallest(limit, members, key=str)
+    if len(members) <= limit:
+        return str(shown)
+    return '%s, ... %d more]' % (str(shown)[:-1], len(members) - limit)
+
+_Members = typing.Union[typing.Container, typing.Iterable]
+
+def _membership(container: _Members) -> _Members:
+    """Return a frozenset with the members of a list or tuple, else `container`.
+
+    Other containers are only checked with ``in``, through `__contains__`.
+    """
+    if type(container) is list or type(container) is tuple:
+        try:
+            return frozenset(container)
+        except TypeError:
+            pass
+    return container
+
+def _listed_members(validator: typing.Union[In, NotIn]) -> str:
+    """Format the members `validator` checks against, its snapshot if it took one."""
+    members = validator._members
+    if isinstance(members, frozenset):
+        return _format_members(members)
+    if isinstance(validator.container, collections.abc.Iterable):
+        return _format_members(validator.container)
+    return str(validator.container)
+
 class In(object):
-    """Validate that a value is in a collection."""
+    """Validate that a value is in a collection.
+
+    Lists and tuples are copied into a frozenset when the validator is
+    created, unless they hold unhashable items. Messages list at most 20 of
+    the allowed values.
+
+    >>> validate = In(['b', 'a', 'c'])
+    >>> validate.validate_batch(['a', 'c', 'a'])
+    ['a', 'c', 'a']
+    >>> with raises(MultipleInvalid, "value must be one of ['a', 'b', 'c'] @ data[1]"):
+    ...   validate.validate_batch(['a', 'd'])
+    """
+    __voluptuous_pure__ = True
 
     def __init__(self, container: typing.Container, msg: typing.Optional[str]=None) -> None:
         self.container = container
         self.msg = msg
+        self._members = _membership(container)
 
     def __call__(self, v):
         try:
-            check = v not in self.container
+            check = v not in self._members
         except TypeError:
-            check = True
-        if check:
             try:
-                raise InInvalid(self.msg or f'value must be one of {sorted(self.container)}')
+                check = v not in self.container
             except TypeError:
-                raise InInvalid(self.msg or f'value must be one of {sorted(self.container, key=str)}')
+                check = True
+        if check:
+            raise InInvalid(self.msg or (lambda: f'value must be one of {_listed_members(self)}'))
         return v
 
+    def validate_batch(self, values: typing.List) -> typing.List:
+        """Validate every item of `values`, comparing them to the allowed values as sets.
+
+        Returns `values` unchanged, or raises a `MultipleInvalid` holding an
+        error for each invalid item, with its index as path.
+        """
+        return _validate_batch(self, values, lambda hashed, members: hashed - members)
+
+    def __voluptuous_fingerprint__(self):
+        return (self.container, self.msg)
+
     def __repr__(self):
         return 'In(%s)' % (self.container,)
 
 class NotIn(object):
-    """Validate that a value is not in a collection."""
+    """Validate that a value is not in a collection.
+
+    Lists and tuples are copied into a frozenset like for :class:`In`.
+    """
+    __voluptuous_pure__ = True
 
     def __init__(self, container: typing.Iterable, msg: typing.Optional[str]=None) -> None:
         self.container = container
         self.msg = msg
+        self._members = _membership(container)
 
     def __call__(self, v):
         try:
-            check = v in self.container
+            check = v in self._members
         except TypeError:
-            check = True
-        if check:
             try:
-                raise NotInInvalid(self.msg or f'value must not be one of {sorted(self.container)}')
+                check = v in self.container
             except TypeError:
-                raise NotInInvalid(self.msg or f'value must not be one of {sorted(self.container, key=str)}')
+                check = True
+        if check:
+            raise NotInInvalid(self.msg or (lambda: f'value must not be one of {_listed_members(self)}'))
         return v
 
+    def validate_batch(self, values: typing.List) -> typing.List:
+        """Validate every item of `values` like `In.validate_batch`."""
+        return _validate_batch(self, values, lambda hashed, members: hashed & members)
+
+    def __voluptuous_fingerprint__(self):
+        return (self.container, self.msg)
+
     def __repr__(self):
         return 'NotIn(%s)' % (self.container,)
 
+def _validate_batch(validator: typing.Union[In, NotIn], values: typing.List, invalid_members: typing.Callable[[typing.Set, typing.FrozenSet], typing.AbstractSet]) -> typing.List:
+    invalid = None
+    members = validator._members
+    if isinstance(members, frozenset):
+        try:
+            invalid = invalid_members(set(values), members)
+        except TypeError:
+            pass
+        else:
+            if not invalid:
+                return values
+    errors = []
+    for index, value in enumerate(values):
+        if invalid is not None and value not in invalid:
+            continue
+        try:
+            validator(value)
+        except Invalid as e:
+            e.prepend([index])
+            errors.append(e)
+    if errors:
+        raise MultipleInvalid(errors)
+    return values
+
 class Contains(object):
     """Validate that the given schema element is in the sequence being validated.
 
@@ -615,6 +1143,7 @@ class Contains(object):
     >>> with raises(ContainsInvalid, 'value is not allowed'):
     ...   s([3, 2])
     """
+    __voluptuous_pure__ = True
 
     def __init__(self, item, msg: typing.Optional[str]=None) -> None:
         self.item = item
@@ -629,6 +1158,9 @@ class Contains(object):
             raise ContainsInvalid(self.msg or 'value is not allowed')
         return v
 
+    def __voluptuous_fingerprint__(self):
+        return (self.item, self.msg)
+
     def __repr__(self):
         return 'Contains(%s)' % (self.item,)
 
@@ -662,9 +1194,25 @@ class ExactSequence(object):
             raise e if self.msg is None else ExactSequenceInvalid(self.msg)
         return v
 
+    def __voluptuous_fingerprint__(self):
+        return (self._schemas, self.msg)
+
+    def __voluptuous_pure__(self):
+        return all((is_pure(v) for v in self._schemas))
+
     def __repr__(self):
         return 'ExactSequence([%s])' % ', '.join((repr(v) for v in self.validators))
 
+def _duplicates(v: typing.Iterable) -> typing.List:
+    seen = set()
+    duplicates = set()
+    for x in v:
+        if x in seen:
+            duplicates.add(x)
+        else:
+            seen.add(x)
+    return list(duplicates)
+
 class Unique(object):
     """Ensure an iterable does not contain duplicate items.
 
@@ -690,6 +1238,7 @@ class Unique(object):
     >>> with raises(Invalid, regex="^contains duplicate items: "):
     ...   s('aabbc')
     """
+    __voluptuous_pure__ = True
 
     def __init__(self, msg: typing.Optional[str]=None) -> None:
         self.msg = msg
@@ -698,13 +1247,14 @@ class Unique(object):
         try:
             set_v = set(v)
         except TypeError as e:
-            raise TypeInvalid(self.msg or f'contains unhashable elements: {e}')
+            raise TypeInvalid(self.msg or 'contains unhashable elements: {0}'.format(e))
         if len(set_v) != len(v):
-            seen = set()
-            dupes = list({x for x in v if x in seen or seen.add(x)})
-            raise Invalid(self.msg or f'contains duplicate items: {dupes}')
+            raise Invalid(self.msg or 'contains duplicate items: {0}'.format(_duplicates(v)))
         return v
 
+    def __voluptuous_fingerprint__(self):
+        return (self.msg,)
+
     def __repr__(self):
         return 'Unique()'
 
@@ -723,6 +1273,7 @@ class Equal(object):
     >>> with raises(Invalid):
     ...     s('foo')
     """
+    __voluptuous_pure__ = True
 
     def __init__(self, target, msg: typing.Optional[str]=None) -> None:
         self.target = target
@@ -733,6 +1284,9 @@ class Equal(object):
             raise Invalid(self.msg or 'Values are not equal: value:{} != target:{}'.format(v, self.target))
         return v
 
+    def __voluptuous_fingerprint__(self):
+        return (self.target, self.msg)
+
     def __repr__(self):
         return 'Equal({})'.format(self.target)
 
@@ -785,6 +1339,12 @@ class Unordered(object):
             raise MultipleInvalid([Invalid(self.msg or 'Element #{} ({}) is not valid against any validator'.format(el[0], el[1])) for el in missing])
         return v
 
+    def __voluptuous_fingerprint__(self):
+        return (self._schemas, self.msg)
+
+    def __voluptuous_pure__(self):
+        return all((is_pure(v) for v in self._schemas))
+
     def __repr__(self):
         return 'Unordered([{}])'.format(', '.join((repr(v) for v in self.validators)))
 
@@ -802,6 +1362,7 @@ class Number(object):
     >>> schema('1234.01')
     Decimal('1234.01')
     """
+    __voluptuous_pure__ = True
 
     def __init__(self, precision: typing.Optional[int]=None, scale: typing.Optional[int]=None, msg: typing.Optional[str]=None, yield_decimal: bool=False) -> None:
         self.precision = precision
@@ -816,17 +1377,20 @@ class Number(object):
         """
         precision, scale, decimal_num = self._get_precision_scale(v)
         if self.precision is not None and self.scale is not None and (precision != self.precision) and (scale != self.scale):
-            raise Invalid(self.msg or 'Precision must be equal to %s, and Scale must be equal to %s' % (self.precision, self.scale))
+            raise Invalid(self.msg or (lambda: 'Precision must be equal to %s, and Scale must be equal to %s' % (self.precision, self.scale)))
         else:
             if self.precision is not None and precision != self.precision:
-                raise Invalid(self.msg or 'Precision must be equal to %s' % self.precision)
+                raise Invalid(self.msg or (lambda: 'Precision must be equal to %s' % self.precision))
             if self.scale is not None and scale != self.scale:
-                raise Invalid(self.msg or 'Scale must be equal to %s' % self.scale)
+                raise Invalid(self.msg or (lambda: 'Scale must be equal to %s' % self.scale))
         if self.yield_decimal:
             return decimal_num
         else:
             return v
 
+    def __voluptuous_fingerprint__(self):
+        return (self.precision, self.scale, self.msg, self.yield_decimal)
+
     def __repr__(self):
         return 'Number(precision=%s, scale=%s, msg=%s)' % (self.precision, self.scale, self.msg)
 
@@ -836,19 +1400,14 @@ class Number(object):
         :return: tuple(precision, scale, decimal_number)
         """
         try:
-            decimal_num = Decimal(str(number))
+            decimal_num = Decimal(number)
         except InvalidOperation:
-            raise Invalid(self.msg or 'Value must be a valid Decimal')
-
-        sign, digits, exponent = decimal_num.as_tuple()
-        if exponent >= 0:
-            precision = len(digits) + exponent
-            scale = 0
+            raise Invalid(self.msg or 'Value must be a number enclosed with string')
+        exp = decimal_num.as_tuple().exponent
+        if isinstance(exp, int):
+            return (len(decimal_num.as_tuple().digits), -exp, decimal_num)
         else:
-            precision = len(digits)
-            scale = -exponent
-
-        return precision, scale, decimal_num
+            raise TypeError('infinity and NaN have no precision')
 
 class SomeOf(_WithSubValidators):
     """Value must pass at least some validations, determined by the given parameter.
@@ -880,5 +1439,76 @@ class SomeOf(_WithSubValidators):
         self.max_valid = max_valid or len(validators)
         super(SomeOf, self).__init__(*validators, **kwargs)
 
+    def _exec(self, funcs, v, path=None):
+        errors = []
+        funcs = list(funcs)
+        for func in funcs:
+            try:
+                if path is None:
+                    v = func(v)
+                else:
+                    v = func(path, v)
+            except Invalid as e:
+                errors.append(e)
+        passed_count = len(funcs) - len(errors)
+        if self.min_valid <= passed_count <= self.max_valid:
+            return v
+        msg = self.msg or (lambda: ', '.join(map(str, errors)))
+        if passed_count > self.max_valid:
+            raise TooManyValid(msg)
+        raise NotEnoughValid(msg)
+
+    def __voluptuous_fingerprint__(self):
+        return super(SomeOf, self).__voluptuous_fingerprint__() + (self.min_valid, self.max_valid)
+
     def __repr__(self):
         return 'SomeOf(min_valid=%s, validators=[%s], max_valid=%s, msg=%r)' % (self.min_valid, ', '.join((repr(v) for v in self.validators)), self.max_valid, self.msg)
+
+class Memoize(object):
+    """Remember the outcomes of a pure validator for recently seen values.
+
+    Useful for expensive validators such as :func:`Email`, :func:`Url` or
+    :class:`Datetime` on data with few distinct values. Equal values of the
+    same type are validated once while they stay in the bounded
+    :class:`~voluptuous.schema_builder.LRU` cache, whose counters are
+    available as `cache`:
+
+    >>> validate = Schema([Memoize(Email(), maxsize=500)])
+    >>> validate(['a@example.com', 'b@example.com', 'a@example.com'])
+    ['a@example.com', 'b@example.com', 'a@example.com']
+    >>> validate.schema[0].cache
+    LRU(maxsize=500, size=2, hits=1, misses=2, evictions=0)
+
+    Errors are remembered too, and raised with the path of each value:
+
+    >>> with raises(MultipleInvalid, 'expected an email address @ data[1]'):
+    ...   validate(['a@example.com', 'nope'])
+
+    The validator must be pure, see :func:`~voluptuous.schema_builder.pure`.
+
+    :param maxsize: Number of distinct values to remember.
+    :param cache: Use this `LRU` instead of a new one, for example to share
+        it between several `Memoize` validators.
+    """
+    __voluptuous_pure__ = True
+
+    def __init__(self, validator: Schemable, maxsize: int=1024, cache: typing.Optional[LRU]=None) -> None:
+        if not is_pure(validator):
+            raise SchemaError('Memoize requires a pure validator, got %r' % (validator,))
+        self.validator = validator
+        self.cache = LRU(maxsize) if cache is None else cache
+        self._schema = Schema(validator)
+
+    def __voluptuous_compile__(self, schema: Schema) -> typing.Callable:
+        return _cached_validator(self.cache, schema._compile(self.validator), self._token(schema))
+
+    def __call__(self, v):
+        schema = self._schema
+        return _cached_validator(self.cache, schema._resolve_compiled(), self._token(schema))([], v)
+
+    def _token(self, schema: Schema) -> tuple:
+        """Key the entries by the compile settings, which change the outcomes of container validators."""
+        return (self, type(schema), schema.required, schema.extra, schema.max_errors)
+
+    def __repr__(self):
+        return 'Memoize(%r, maxsize=%d)' % (self.validator, self.cache.maxsize)